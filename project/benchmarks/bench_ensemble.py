@@ -0,0 +1,29 @@
+"""
+Ensemble throughput: scenario-epochs per second of one EnsembleEnv
+holding S scenarios vs S back-to-back `simulate` runs, as S grows.
+The margin policy's per-agent Philox noise costs the same either way,
+so its gain is smaller than truthful's.
+
+    cd project && python -m benchmarks.bench_ensemble
+"""
+from src.sweep import grid, run_ensemble, run_sweep
+from .suite import measure
+
+ONCE = dict(min_time=0, min_reps=1, max_reps=1, trace=False)   # one untraced run per case
+
+
+def main(scenarios=(1, 4, 16, 64), sizes=(100, 1_000), epochs=20, policies=("truthful", "margin")):
+    print(f"{'policy':>8} {'N':>6} {'S':>4} {'serial sc-ep/s':>15} {'ensemble sc-ep/s':>17} {'speed-up':>9}")
+    for policy in policies:
+        for n in sizes:
+            for S in scenarios:
+                points = grid(seed=range(S))
+                common = dict(epochs=epochs, n_buyers=n, policy=policy)
+                ts = measure(lambda: run_sweep(points, workers=1, **common), **ONCE)["best_s"]
+                te = measure(lambda: run_ensemble(points, **common), **ONCE)["best_s"]
+                print(f"{policy:>8} {n:>6} {S:>4} {S * epochs / ts:>15.0f} "
+                      f"{S * epochs / te:>17.0f} {ts / te:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Gini scaling: sort-based `ladder.gini` vs the old n×n pairwise form.
+
+    cd project && python -m benchmarks.bench_gini
+"""
+import numpy as np
+from src.ladder import gini
+from .suite import measure
+
+PAIRWISE_MAX_N = 5_000          # 25M float64s – the dashboard cap
+
+
+def gini_pairwise(eff):
+    n = len(eff)
+    return np.abs(eff[:, None] - eff[None, :]).sum() / (2 * n**2 * eff.mean())
+
+
+def main(sizes=(100, 1_000, 5_000, 100_000, 1_000_000)):
+    rng = np.random.default_rng(0)
+    print(f"{'n':>10} {'sorted s':>10} {'sorted MB':>10} {'pairwise s':>11} {'pairwise MB':>12}")
+    for n in sizes:
+        x = rng.lognormal(3, 1, n)
+        r = measure(lambda: gini(x))
+        row = f"{n:>10} {r['best_s']:>10.5f} {r['peak_mb']:>10.1f}"
+        if n <= PAIRWISE_MAX_N:
+            rp = measure(lambda: gini_pairwise(x), min_time=0, min_reps=1, max_reps=1)
+            assert abs(gini(x) - gini_pairwise(x)) < 1e-9
+            row += f" {rp['best_s']:>11.5f} {rp['peak_mb']:>12.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Rebate solvers: exact 1-D transport vs dense stabilised Sinkhorn,
+as donor and recipient counts grow.
+
+    cd project && python -m benchmarks.bench_rebate
+"""
+import numpy as np
+from src.fairness.ot_rebate import rebate
+from .suite import measure
+
+SINKHORN_MAX = 1_000            # dense solve takes minutes beyond this
+
+
+def main(sizes=((10, 100), (100, 1_000), (300, 1_000), (10_000, 100_000), (100_000, 1_000_000))):
+    rng = np.random.default_rng(0)
+    print(f"{'donors':>8} {'recips':>9} {'exact1d s':>10} {'sinkhorn s':>11} {'max |Δ|':>9}")
+    for n, m in sizes:
+        d_inc = rng.lognormal(12, 0.5, n)
+        d_tok = rng.uniform(0, 5, n)
+        r_inc = rng.uniform(1e3, 1e4, m)
+        out = {}                                   # solver → credits of the timed call
+        def timed(solver):
+            run = lambda: out.__setitem__(solver, rebate(d_inc, d_tok, r_inc, solver=solver))
+            return measure(run, min_time=0, min_reps=1, max_reps=1, trace=False)["best_s"]
+        row = f"{n:>8} {m:>9} {timed('exact1d'):>10.5f}"
+        if max(n, m) <= SINKHORN_MAX:
+            ts = timed("sinkhorn")
+            row += f" {ts:>11.5f} {np.abs(out['exact1d'] - out['sinkhorn']).max():>9.2e}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Load generator for the bid server: C concurrent clients, each owning a
+slice of the buyers, answer every observation push with truthful bids
+sent in messages of `--msg-bids` and time each message until its ack.
+Reports the burst rate (bids acked per second from an epoch's observation
+push to its last ack, so the idle rest of the bidding window does not
+count), ack round-trip percentiles and the server's own ingestion metrics.
+
+    cd project
+    python -m benchmarks.loadgen --buyers 100000 --clients 8        # in-process server
+    python serve.py --buyers 100000 &                               # or a separate process
+    python -m benchmarks.loadgen --port 8765 --buyers 100000 --clients 8 --epochs 5
+"""
+import argparse, asyncio, json, time
+import numpy as np
+from src.config import cfg
+from src.env.buyers import BuyerStore
+from src.env.market_env import MarketplaceEnv
+from src.policies import truthful
+from src.server import LINE_LIMIT, BidServer
+
+
+async def _client(host, port, agents, epochs, msg_bids, rtt, bursts):
+    reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+    writer.write(json.dumps({"op": "subscribe", "agents": agents}).encode() + b"\n")
+    sent, acked, closed, mid = {}, 0, 0, 0
+    while closed < epochs and (line := await reader.readline()):   # EOF: server stopped
+        msg = json.loads(line)
+        if msg["op"] == "obs":
+            burst = bursts.setdefault(msg["epoch"], [time.perf_counter(), 0.0])
+            obs = np.column_stack([np.tile(msg["prices"], (len(msg["agents"]), 1)),
+                                   msg["income"], msg["credit"]])
+            tiers, bids = truthful.act_batch(obs, cfg=cfg)
+            K = len(msg["prices"])
+            rows = [r for r in zip(msg["agents"], tiers.tolist(), bids.tolist()) if r[1] < K]
+            for start in range(0, len(rows), msg_bids):
+                chunk = rows[start:start + msg_bids]
+                mid += 1
+                sent[mid] = time.perf_counter()
+                writer.write(json.dumps({"op": "bid", "id": mid, "epoch": msg["epoch"],
+                                         "bids": chunk}).encode() + b"\n")
+            await writer.drain()
+        elif msg["op"] == "ack":
+            rtt.append(time.perf_counter() - sent.pop(msg["id"]))
+            acked += msg["accepted"]
+            burst[1] = max(burst[1], time.perf_counter())
+        elif msg["op"] == "closed":
+            closed += 1
+    writer.close()
+    return acked
+
+
+async def _server_metrics(host, port):
+    try:
+        reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+    except OSError:                                    # external server already gone
+        return None
+    writer.write(b'{"op": "metrics"}\n')
+    line = await reader.readline()
+    writer.close()
+    return json.loads(line) if line else None
+
+
+async def run(buyers=10_000, clients=4, epochs=3, epoch_seconds=1.0, msg_bids=256,
+              batch_size=4096, batch_interval=0.005, host="127.0.0.1", port=None):
+    server = None
+    if port is None:                                   # in-process server on a free port
+        income = np.random.default_rng(cfg.seed).lognormal(3.0, 1.0, buyers)
+        env = MarketplaceEnv(BuyerStore([f"b{i}" for i in range(buyers)], income),
+                             [10, 15, 20, 25], cfg=cfg)
+        server = await BidServer(env, host, 0, epoch_seconds, batch_size, batch_interval,
+                                 epochs=None).start()
+        port = server.port
+    slices = np.array_split(np.arange(buyers), clients)
+    rtt, bursts = [], {}                               # epoch → [first obs, last ack]
+    t0 = time.perf_counter()
+    acked = await asyncio.gather(*(_client(host, port, [f"b{i}" for i in s], epochs, msg_bids,
+                                           rtt, bursts) for s in slices))
+    wall = time.perf_counter() - t0
+    metrics = await _server_metrics(host, port)
+    if server is not None:
+        await server.close()
+    rtt_ms = np.array(rtt) * 1e3
+    burst_s = sum(last - first for first, last in bursts.values() if last)
+    return {"clients": clients, "buyers": buyers, "epochs": epochs, "wall_s": wall,
+            "bids_acked": sum(acked), "burst_s": burst_s, "bids_per_s": sum(acked) / burst_s,
+            "ack_p50_ms": float(np.percentile(rtt_ms, 50)),
+            "ack_p99_ms": float(np.percentile(rtt_ms, 99)),
+            "server": metrics}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--buyers", type=int, default=10_000, help="must match the server's buyers")
+    p.add_argument("--clients", type=int, default=4)
+    p.add_argument("--epochs", type=int, default=3)
+    p.add_argument("--epoch-seconds", type=float, default=1.0, help="in-process server only")
+    p.add_argument("--msg-bids", type=int, default=256, help="bids per message")
+    p.add_argument("--batch-size", type=int, default=4096, help="in-process server only")
+    p.add_argument("--batch-interval", type=float, default=0.005, help="in-process server only")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, help="use a running server instead of an in-process one")
+    p.add_argument("--out", help="write results JSON here")
+    a = p.parse_args(argv)
+
+    res = asyncio.run(run(a.buyers, a.clients, a.epochs, a.epoch_seconds, a.msg_bids,
+                          a.batch_size, a.batch_interval, a.host, a.port))
+    s = res["server"]
+    print(f"{res['bids_acked']} bids acked, {res['bids_per_s']:,.0f} bids/s in bursts; "
+          f"ack p50 {res['ack_p50_ms']:.1f} ms  p99 {res['ack_p99_ms']:.1f} ms")
+    if s:
+        print(f"server: {s['batches']} batches (mean {s['mean_batch']:.0f} bids), "
+              f"ingest latency p50 {s['latency_p50_ms']:.2f} ms  p99 {s['latency_p99_ms']:.2f} ms, "
+              f"closure {s['closure_ms']:.1f} ms")
+    if a.out:
+        with open(a.out, "w") as f:
+            json.dump(res, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Startup benchmarks for short jobs: wall time of a fresh interpreter
+running `run_batch.py --epochs 1` (and of bare `import src.simulate`),
+and time to bring up a sweep worker pool per multiprocessing start method.
+Output is suite-compatible JSON, so `--compare` gates the same way.
+
+    cd project
+    python -m benchmarks.startup --out startup.json
+    python -m benchmarks.startup --compare startup.json
+"""
+import argparse, json, multiprocessing as mp, pathlib, subprocess, sys, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+from .suite import compare, measure
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def _wall(cmd):
+    return lambda: subprocess.run(cmd, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+
+def _ready(_):
+    import src.sweep                                   # what a sweep worker unpickles
+    return True
+
+def _pool(method, workers):
+    _ready(None)                                       # parent state of a real sweep before forking
+    def run():
+        with ProcessPoolExecutor(workers, mp_context=mp.get_context(method)) as ex:
+            list(ex.map(_ready, range(workers)))
+    return run
+
+def run(reps=5, workers=4, methods=None):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = {
+            "startup.import": (1, _wall([sys.executable, "-c", "import src.simulate"])),
+            "startup.run_batch": (1, _wall([sys.executable, "run_batch.py", "--epochs", "1",
+                                            "--no-cache", "--out", f"{tmp}/kpis.parquet"])),
+        }
+        for m in methods or mp.get_all_start_methods():
+            cases[f"spawn.{m}"] = (workers, _pool(m, workers))
+        for name, (n, fn) in cases.items():
+            # whole-process timings: a fixed rep count, no traced (parent-only) memory
+            res = {"case": name, "n": n,
+                   **measure(fn, min_time=0, min_reps=reps, max_reps=reps, trace=False)}
+            print(f"{name:<22} n={n:<3} best {res['best_s']*1e3:9.1f} ms  "
+                  f"median {res['median_s']*1e3:9.1f} ms", flush=True)
+            results.append(res)
+    return {"meta": {"python": sys.version.split()[0],
+                     "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--reps", type=int, default=5)
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--methods", nargs="+", choices=mp.get_all_start_methods())
+    p.add_argument("--out", help="write results JSON here")
+    p.add_argument("--compare", metavar="BASELINE", help="flag regressions against this JSON")
+    p.add_argument("--threshold", type=float, default=1.25, help="max median-time ratio")
+    a = p.parse_args(argv)
+
+    current = run(a.reps, a.workers, a.methods)
+    if a.out:
+        with open(a.out, "w") as f:
+            json.dump(current, f, indent=1)
+    if a.compare:
+        with open(a.compare) as f:
+            regressions = compare(current, json.load(f), a.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['case']} n={r['n']}: time ×{r['time_ratio']:.2f}")
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Benchmark suite: closure, rebate, Gini, ladder update, ledger and
+policies at several population sizes, with wall time and peak traced
+memory per case.  Results go to JSON; `--compare` checks them against a
+stored baseline and exits non-zero on regressions.
+
+    cd project
+    python -m benchmarks.suite --out bench.json                  # measure
+    python -m benchmarks.suite --compare bench.json              # gate
+    python -m benchmarks.suite --sizes 100 1000 --cases ladder.gini  # subset
+"""
+import argparse, json, platform, statistics, sys, tempfile, time, tracemalloc
+import numpy as np
+from src.config import Config
+from src.env.buyers import BuyerStore
+from src.env.market_env import MarketplaceEnv
+from src.fairness.ot_rebate import rebate
+from src.ladder import gini, update_prices
+from src.policies import truthful, margin
+from src.tokens.ledger import MemoryLedger, SqliteLedger
+
+SIZES = (100, 1_000, 10_000, 100_000)
+PRICES = np.array([10., 15., 20., 25.])
+
+
+# ---------- cases: setup(n) -> zero-arg callable ----------
+def _obs(n, rng):
+    return np.column_stack([np.tile(PRICES, (n, 1)), rng.lognormal(3, 1, n), rng.uniform(0, 5, n)])
+
+def closure(n, rng):
+    cfg = Config()
+    env = MarketplaceEnv(BuyerStore(range(n), rng.lognormal(3, 1, n)), PRICES, cfg=cfg)
+    for _ in range(3):                                 # warm ledger and credits
+        env.reset(); env.step_batch(*truthful.act_batch(env.observations(), cfg))
+    env.reset()
+    tiers, bids = truthful.act_batch(env.observations(), cfg)
+    def run():
+        env.reset(); env.step_batch(tiers, bids)
+    return run
+
+def rebate_exact(n, rng):
+    d_inc, d_tok = rng.lognormal(12, .5, max(n // 10, 1)), rng.uniform(0, 5, max(n // 10, 1))
+    r_inc = rng.uniform(1e3, 1e4, n)
+    return lambda: rebate(d_inc, d_tok, r_inc, solver="exact1d")
+
+def gini_sorted(n, rng):
+    x = rng.lognormal(3, 1, n)
+    return lambda: gini(x)
+
+def ladder_update(n, rng):
+    cfg, sales = Config(), rng.integers(0, 30, 4).astype(float)
+    return lambda: update_prices(PRICES, sales, 1e3, 0.3, 0.8, cfg)
+
+def _ledger_case(make, op):
+    def setup(n, rng):
+        led = make()
+        donors, tokens = rng.integers(0, n, max(n // 10, 1)), rng.uniform(0, 5, max(n // 10, 1))
+        for e in range(4):
+            led.mint_many(e, donors, tokens)
+        epoch = [4]
+        def run():
+            if op == "load":                           # full 4-epoch window
+                led.load(3, 3)
+                return
+            led.mint_many(epoch[0], donors, tokens)
+            if op == "expire":                         # mint + expire keeps the window full
+                led.expire(epoch[0], 3)
+            epoch[0] += 1
+        return run
+    return setup
+
+_TMP = tempfile.TemporaryDirectory()            # removed at interpreter exit
+
+def _sqlite():
+    return SqliteLedger(f"{_TMP.name}/vault.db")   # fresh run_id per case
+
+def policy_truthful(n, rng):
+    obs = _obs(n, rng)
+    return lambda: truthful.act_batch(obs)
+
+def policy_margin(n, rng):
+    obs = _obs(n, rng)
+    return lambda: margin.act_batch(obs, epoch=1)
+
+CASES = {
+    "closure":            closure,
+    "rebate.exact1d":     rebate_exact,
+    "ladder.gini":        gini_sorted,
+    "ladder.update":      ladder_update,
+    "ledger.memory.mint":   _ledger_case(lambda: MemoryLedger(3), "mint"),
+    "ledger.memory.load":   _ledger_case(lambda: MemoryLedger(3), "load"),
+    "ledger.memory.expire": _ledger_case(lambda: MemoryLedger(3), "expire"),
+    "ledger.sqlite.mint":   _ledger_case(_sqlite, "mint"),
+    "ledger.sqlite.load":   _ledger_case(_sqlite, "load"),
+    "ledger.sqlite.expire": _ledger_case(_sqlite, "expire"),
+    "policy.truthful":    policy_truthful,
+    "policy.margin":      policy_margin,
+}
+
+
+# ---------- measurement ----------
+def measure(fn, min_time=0.2, min_reps=3, max_reps=50, trace=True):
+    """
+    Time fn() until min_time has elapsed, then trace one call's peak memory
+    (`trace=False` skips that extra call and leaves out peak_mb).
+    """
+    times = []
+    while len(times) < min_reps or (sum(times) < min_time and len(times) < max_reps):
+        t0 = time.perf_counter(); fn()
+        times.append(time.perf_counter() - t0)
+    res = {"best_s": min(times), "median_s": statistics.median(times), "reps": len(times)}
+    if trace:
+        tracemalloc.start()
+        fn()
+        res["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return res
+
+def run_suite(cases=None, sizes=SIZES, seed=0):
+    results = []
+    for name in cases or CASES:
+        for n in sizes:
+            fn = CASES[name](n, np.random.default_rng(seed))
+            res = {"case": name, "n": n, **measure(fn)}
+            print(f"{name:<22} n={n:<8} best {res['best_s']*1e3:10.3f} ms"
+                  f"  median {res['median_s']*1e3:10.3f} ms  peak {res['peak_mb']:8.2f} MB",
+                  flush=True)
+            results.append(res)
+    return {"meta": {"python": platform.python_version(), "numpy": np.__version__,
+                     "machine": platform.machine(), "platform": platform.platform(),
+                     "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results}
+
+def compare(current, baseline, threshold=1.25, mem_threshold=1.5, floor_s=1e-4):
+    """
+    Regressions of `current` vs `baseline` (both suite outputs): cases whose
+    median time grew by more than `threshold`× (ignoring sub-`floor_s`
+    timings, which are noise) or peak memory by more than `mem_threshold`×.
+    """
+    base = {(r["case"], r["n"]): r for r in baseline["results"]}
+    out = []
+    for r in current["results"]:
+        b = base.get((r["case"], r["n"]))
+        if b is None:
+            continue
+        t_ratio = r["median_s"] / b["median_s"] if b["median_s"] > 0 else 1.0
+        m_ratio = r["peak_mb"] / b["peak_mb"] if b.get("peak_mb", 0) > 0 else 1.0
+        if (t_ratio > threshold and r["median_s"] > floor_s) or m_ratio > mem_threshold:
+            out.append({"case": r["case"], "n": r["n"],
+                        "time_ratio": t_ratio, "mem_ratio": m_ratio})
+    return out
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--cases", nargs="+", choices=list(CASES))
+    p.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    p.add_argument("--out", help="write results JSON here")
+    p.add_argument("--compare", metavar="BASELINE", help="flag regressions against this JSON")
+    p.add_argument("--threshold", type=float, default=1.25, help="max median-time ratio")
+    p.add_argument("--mem-threshold", type=float, default=1.5, help="max peak-memory ratio")
+    a = p.parse_args(argv)
+
+    current = run_suite(a.cases, a.sizes)
+    if a.out:
+        with open(a.out, "w") as f:
+            json.dump(current, f, indent=1)
+    if a.compare:
+        with open(a.compare) as f:
+            regressions = compare(current, json.load(f), a.threshold, a.mem_threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['case']} n={r['n']}: time ×{r['time_ratio']:.2f}, "
+                  f"memory ×{r['mem_ratio']:.2f}")
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
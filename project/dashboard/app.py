@@ -21,18 +21,16 @@ if repo_root not in sys.path:
 try:
     # Import standard libraries and dependencies first
     import streamlit as st
-    import numpy as np
     import pandas as pd
-    import sqlite3
     import plotly.express as px
     
     # Import our project modules using the full path from project root
-    from src.config import cfg, rng
-    from src.env.market_env import MarketplaceEnv
-    from src.ladder import gini
-    from src.policies.truthful import act as truthful_act
-    from src.policies.margin import act as margin_act
-    from src.tokens import ledger
+    import threading, time
+    from streamlit import runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    from src.config import cfg
+    from src.simulate import iter_epochs
+    from src.result_cache import ResultCache, run_key, run_params
 except Exception as e:
     import streamlit as st
     st.error(f"Import error: {e}")
@@ -82,83 +80,71 @@ income_sigma = st.sidebar.number_input("Income lognormal σ", 0.1, 2.0, 1.0, 0.1
 lambda_val = st.sidebar.slider("Solidarity factor λ", 0.0, 1.0, float(cfg.lambda_), 0.05,
                                help="Share of each Shapley gap extracted as reserve (0=revenue-max, 1=fairness-max)")
 
+profile_closure = st.sidebar.checkbox("Profile closure phases", False,
+                                      help="Time each nightly-closure phase (auction, ledger, rebate, Gini, ladder).")
+
 run_btn  = st.sidebar.button("Run simulation 🚀")
 
 # -------- helper to run the model --------
-@st.cache_data(show_spinner="Running simulation …", max_entries=5)
-def run_sim(n_epochs: int, n_buyers: int, price_str: str, policy: str, 
-            margin_shade: float = 0.7, margin_random: bool = True,
-            mu_inc: float = 3.0, sigma_inc: float = 1.0,
-            lambda_val: float = cfg.lambda_) -> pd.DataFrame:
+def sim_kwargs(n_epochs: int, n_buyers: int, price_str: str, policy: str,
+               margin_shade: float = 0.7, margin_random: bool = True,
+               mu_inc: float = 3.0, sigma_inc: float = 1.0,
+               lambda_val: float = cfg.lambda_, profile: bool = False) -> dict:
     price_list = [float(p.strip()) for p in price_str.split(",") if p.strip()]
 
-    # fresh RNG so cached results are reproducible given the same inputs
-    local_rng = np.random.default_rng(seed=42)
+    # isolated Config/RNG/ledger per run, so results are reproducible
+    # given the same inputs and the global cfg is never mutated
+    return dict(epochs=n_epochs, n_buyers=n_buyers, prices=price_list,
+                policy="truthful" if policy == "Truthful" else "margin",
+                shade_factor=margin_shade, randomize=margin_random,
+                income_mu=mu_inc, income_sigma=sigma_inc, seed=42,
+                lambda_=lambda_val, profile=profile)
 
-    # Clean the token database for a fresh simulation
-    try:
-        import pathlib
-        db_path = pathlib.Path(__file__).parent.parent / "src" / "tokens" / "tokens.db"
-        with sqlite3.connect(db_path) as con, con:
-            con.execute("DELETE FROM vault")
-    except Exception as e:
-        print(f"Token DB cleanup failed: {e}")
-
-    # set solidarity factor
-    cfg.lambda_ = lambda_val
-
-    # Act function selection
-    if policy == "Truthful":
-        agent_act = truthful_act
-    else:  # Margin-seeking
-        def agent_act(obs):
-            return margin_act(obs, shade_factor=margin_shade, randomize=margin_random)
-
-    buyers = {f"b{i}": {"income": local_rng.lognormal(mu_inc, sigma_inc)}
-              for i in range(n_buyers)}
-    env    = MarketplaceEnv(buyers, price_list)
-
-    records = []
-    for epoch in range(n_epochs):
-        obs, _ = env.reset(); done = {a: False for a in env.agents}
-        while not all(done.values()):
-            acts = {a: agent_act(o) for a, o in obs.items() if not done[a]}
-            obs, _, done, _, _ = env.step(acts)
-        # Compute effective price vector and its Gini coefficient
-        eff = np.array([env.prices[env._tier(a)] - env.buyers[a]["credit"]
-                        for a in env.agents if env._tier(a) is not None])
-        rec = {"epoch": epoch,
-               "revenue": env.revenue,
-               "gini": gini(eff)}
-        # Get token vault balance before the next auction
-        tokens_in_vault = 0
+class SimJob:
+    """
+    Runs `iter_epochs` on a background thread; the page polls `records`.
+    `cancel` is checked between epochs: set by a rerun or the Cancel
+    button, and by the worker itself once the owning session has ended.
+    """
+
+    def __init__(self, kwargs: dict, session_id: str = None):
+        self.kwargs  = kwargs
+        self.records = []
+        self.error   = None
+        self.session_id = session_id              # None outside a Streamlit server
+        self.cancel  = threading.Event()
+        self.thread  = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _session_ended(self) -> bool:
+        return (self.session_id is not None and runtime.exists()
+                and not runtime.get_instance().is_active_session(self.session_id))
+
+    def _run(self):
         try:
-            rows = ledger.load(env.epoch, cfg.token_expiry)
-            if rows:
-                tokens_in_vault = sum(t for _, t in rows)
-        except Exception as e:
-            print(f"Token load failed: {e}")
-        rec["token_balance"] = tokens_in_vault
-        rec["minted"] = env.minted_last
-        rec["expired"] = env.expired_last
-        # store each tier price separately for later plotting
-        for idx, price in enumerate(env.prices):
-            rec[f"p{idx}"] = price
-        records.append(rec)
-    return pd.DataFrame(records)
+            for rec in iter_epochs(**self.kwargs):
+                if self._session_ended():         # tab closed: nobody will read the result
+                    self.cancel.set()
+                if self.cancel.is_set():
+                    break
+                self.records.append(rec)
+        except Exception as e:                    # surfaced on the page
+            self.error = e
 
-# -------- run & display --------
-if run_btn:
-    if policy_type == "Truthful":
-        df = run_sim(epochs, buyers_n, prices, policy_type,
-                      mu_inc=income_mean, sigma_inc=income_sigma,
-                      lambda_val=lambda_val)
-    else:
-        df = run_sim(epochs, buyers_n, prices, policy_type,
-                     margin_shade=shade_factor, margin_random=use_randomization,
-                     mu_inc=income_mean, sigma_inc=income_sigma,
-                     lambda_val=lambda_val)
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(list(self.records))
+
+@st.cache_resource
+def result_cache() -> ResultCache:
+    """On-disk KPI frames shared across sessions and restarts."""
+    return ResultCache()
+
+def cache_key(kwargs: dict):
+    """Result-cache key for a run, or None if it can't be cached (profiled runs)."""
+    params = run_params(**kwargs)
+    return run_key(params) if params is not None else None
 
+def render(df: pd.DataFrame, tick: int = 0, final: bool = True):
     st.subheader("Revenue per Epoch")
     st.line_chart(df.set_index("epoch")[["revenue"]]
                     .rename(columns={"revenue": "Revenue (€)"}))
@@ -170,17 +156,27 @@ if run_btn:
         st.metric("Final Token Balance", f"{df['token_balance'].iloc[-1]:.1f} €")
     with cols[1]:
         st.metric("Peak Token Balance", f"{df['token_balance'].max():.1f} €")
-    
+
     # Token balance chart
     st.line_chart(df.set_index("epoch")[["token_balance"]]
                    .rename(columns={"token_balance": "Tokens in Vault (€)"}))
 
     # Mint vs Expire chart
-    st.subheader("Mint vs. Expire per Epoch")
-    mint_exp_plot = px.bar(df, x="epoch", y=["minted", "expired"],
+    st.subheader("Mint vs. Expire vs. Rebate Credits per Epoch")
+    mint_exp_plot = px.bar(df, x="epoch", y=[c for c in ("minted", "expired", "credits_issued")
+                                             if c in df.columns],
                            labels={"value": "Tokens (€)"}, barmode="relative")
     mint_exp_plot.update_layout(showlegend=True)
-    st.plotly_chart(mint_exp_plot, use_container_width=True)
+    st.plotly_chart(mint_exp_plot, use_container_width=True, key=f"mint_exp_{tick}")
+
+    # ----- sales -----
+    sold_cols = [c for c in df.columns if c.startswith("sold")]
+    if sold_cols:
+        st.subheader("Units Sold per Tier")
+        sales_plot = px.bar(df, x="epoch", y=sold_cols, labels={"value": "Units"}, barmode="stack")
+        st.plotly_chart(sales_plot, use_container_width=True, key=f"sales_{tick}")
+        st.line_chart(df.set_index("epoch")[["sell_through"]]
+                        .rename(columns={"sell_through": "Sell-through"}))
 
     st.subheader("Gini per Epoch (effective prices)")
     st.line_chart(df.set_index("epoch")[["gini"]])
@@ -191,11 +187,73 @@ if run_btn:
         st.subheader("Tier Prices over Epochs")
         st.line_chart(df.set_index("epoch")[price_cols])
 
+    # ----- closure profile -----
+    phase_cols = [c for c in df.columns if c.startswith("t_")]
+    if phase_cols:
+        st.subheader("Closure Time by Phase")
+        phase_plot = px.bar(df, x="epoch", y=phase_cols,
+                            labels={"value": "Seconds"}, barmode="stack")
+        st.plotly_chart(phase_plot, use_container_width=True, key=f"phases_{tick}")
+
+    if not final:
+        return
     st.subheader("Raw KPIs")
     st.dataframe(df, use_container_width=True)
 
     # Offer download
     csv = df.to_csv(index=False).encode()
     st.download_button("Download CSV", data=csv, file_name="kpis.csv", mime="text/csv")
+
+# -------- run & display --------
+if run_btn:
+    if policy_type == "Truthful":
+        kwargs = sim_kwargs(epochs, buyers_n, prices, policy_type,
+                            mu_inc=income_mean, sigma_inc=income_sigma,
+                            lambda_val=lambda_val, profile=profile_closure)
+    else:
+        kwargs = sim_kwargs(epochs, buyers_n, prices, policy_type,
+                            margin_shade=shade_factor, margin_random=use_randomization,
+                            mu_inc=income_mean, sigma_inc=income_sigma,
+                            lambda_val=lambda_val, profile=profile_closure)
+    if st.session_state.get("job") is not None:      # a new run replaces the old one
+        st.session_state.job.cancel.set()
+    key    = cache_key(kwargs)
+    cached = result_cache().get(key) if key is not None else None
+    ctx    = get_script_run_ctx()
+    st.session_state.job     = (SimJob(kwargs, ctx.session_id if ctx else None)
+                                if cached is None else None)
+    st.session_state.job_key = key
+    st.session_state.cached  = cached
+
+job = st.session_state.get("job")
+if job is not None:
+    # stream: redraw from the worker's records until it finishes or is cancelled
+    if st.sidebar.button("Cancel run ⏹"):
+        job.cancel.set()
+    total = job.kwargs["epochs"]
+    progress, view, tick = st.progress(0.0), st.empty(), 0
+    while job.thread.is_alive() and not job.cancel.is_set():
+        n = len(job.records)
+        progress.progress(n / total, text=f"Epoch {n} / {total}")
+        if n:
+            tick += 1
+            with view.container():
+                render(job.frame(), tick, final=False)
+        time.sleep(0.25)
+    job.thread.join()
+    progress.empty()
+    st.session_state.job = None
+    df = job.frame()
+    with view.container():
+        if job.error is not None:
+            st.error(f"Simulation failed: {job.error}")
+        elif job.cancel.is_set():
+            st.warning(f"Run cancelled after {len(df)} of {total} epochs.")
+        elif st.session_state.job_key is not None:
+            result_cache().put(st.session_state.job_key, df)
+        if len(df):
+            render(df, tick + 1)
+elif run_btn:
+    render(st.session_state.cached)
 else:
     st.info("Set parameters in the sidebar and press **Run simulation** to begin.")
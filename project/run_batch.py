@@ -1,20 +1,47 @@
-import argparse, numpy as np, pandas as pd
-from src.config import cfg, rng
-from src.env.market_env import MarketplaceEnv
-from src.policies.truthful import act
+import argparse, contextlib
+import pyarrow as pa
+from src.columnar import ColumnWriter
+from src.config import cfg
+from src.result_cache import ResultCache, run_key, run_params
+from src.simulate import iter_epochs
+from src.tokens.ledger import SqliteLedger
 
 p = argparse.ArgumentParser(); p.add_argument("--epochs", type=int, default=30)
-E = p.parse_args().epochs
+p.add_argument("--buyers", type=int, default=800)
+p.add_argument("--chunk-size", type=int, help="out-of-core mode: stream memory-mapped buyers in chunks of this size")
+p.add_argument("--population-dir", help="where out-of-core mode keeps income/credit .npy files (default: temporary)")
+p.add_argument("--vault", help="persist tokens to this SQLite file (default: in memory)")
+p.add_argument("--run-id", help="namespace inside --vault (default: random)")
+p.add_argument("--profile", action="store_true", help="add per-phase closure timings to the KPIs")
+p.add_argument("--out", default="kpis.parquet", help="per-epoch KPIs (.parquet, .arrow or .csv)")
+p.add_argument("--trace", help="per-agent tier/bid/credit/effective price per epoch (.parquet or .arrow)")
+p.add_argument("--chunk-rows", type=int, default=65_536, help="rows buffered before each write")
+p.add_argument("--cache-dir", help="result cache location (default: $STASSEL_CACHE_DIR or ~/.cache/s-tassel/results)")
+p.add_argument("--no-cache", action="store_true", help="always simulate, never read or write the result cache")
+args = p.parse_args(); E = args.epochs
 
-buyers = {f"b{i}": {"income": rng.lognormal(3, 1)} for i in range(800)}
-env    = MarketplaceEnv(buyers, [10, 15, 20, 25])
+ledger = SqliteLedger(args.vault, args.run_id) if args.vault else None
+kwargs = dict(epochs=E, n_buyers=args.buyers, prices=[10, 15, 20, 25], seed=cfg.seed,
+              cfg=cfg, ledger=ledger, profile=args.profile,
+              chunk_size=args.chunk_size, population_dir=args.population_dir)
 
-records = []
-for epoch in range(E):
-    obs,_ = env.reset(); done = {a: False for a in env.agents}
-    while not all(done.values()):
-        acts = {a: act(o) for a,o in obs.items() if not done[a]}
-        obs,_,done,_,_ = env.step(acts)
-    records.append({"epoch": epoch, "revenue": env.revenue})
-pd.DataFrame(records).to_csv("kpis.csv", index=False)
+# runs with an external vault, timings or a trace are never served from the cache
+params = None if args.no_cache or args.trace else run_params(**kwargs)
+cache  = ResultCache(args.cache_dir) if params is not None else None
+key    = run_key(params) if params is not None else None
+cached = cache.get_table(key) if cache is not None else None
+
+with contextlib.ExitStack() as stack:
+    out = stack.enter_context(ColumnWriter(args.out, args.chunk_rows))
+    if cached is not None:
+        out.write_table(cached)
+    else:
+        trace = (stack.enter_context(ColumnWriter(args.trace, args.chunk_rows))
+                 if args.trace else None)
+        records = []
+        for rec in iter_epochs(trace=trace, **kwargs):
+            out.write(rec)
+            records.append(rec)                    # one small row per epoch
+        if cache is not None:
+            cache.put(key, pa.Table.from_pylist(records))
 print("batch run finished")
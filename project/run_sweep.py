@@ -0,0 +1,29 @@
+import argparse, time
+from src.config import Config
+from src.simulate import POLICIES
+from src.sweep import grid, run_sweep
+
+if __name__ == "__main__":
+    d = Config()
+    p = argparse.ArgumentParser(description="Grid sweep over λ, β, ζ, income μ/σ, policy and seed.")
+    p.add_argument("--lambda", dest="lambda_", type=float, nargs="+", default=[d.lambda_])
+    p.add_argument("--beta",   type=float, nargs="+", default=[d.beta])
+    p.add_argument("--zeta",   type=float, nargs="+", default=[d.zeta])
+    p.add_argument("--mu",     type=float, nargs="+", default=[3.0], help="income lognormal μ")
+    p.add_argument("--sigma",  type=float, nargs="+", default=[1.0], help="income lognormal σ")
+    p.add_argument("--policy", nargs="+", choices=POLICIES, default=["truthful"])
+    p.add_argument("--seed",   type=int, nargs="+", default=[d.seed])
+    p.add_argument("--epochs", type=int, default=30)
+    p.add_argument("--buyers", type=int, default=800)
+    p.add_argument("--prices", default="10,15,20,25")
+    p.add_argument("--workers", type=int, help="processes (default: all cores)")
+    p.add_argument("--out", default="sweep.csv")
+    a = p.parse_args()
+
+    points = grid(lambda_=a.lambda_, beta=a.beta, zeta=a.zeta,
+                  income_mu=a.mu, income_sigma=a.sigma, policy=a.policy, seed=a.seed)
+    t0 = time.perf_counter()
+    df = run_sweep(points, workers=a.workers, epochs=a.epochs, n_buyers=a.buyers,
+                   prices=[float(x) for x in a.prices.split(",")])
+    df.to_csv(a.out, index=False)
+    print(f"{len(points)} runs × {a.epochs} epochs in {time.perf_counter() - t0:.1f}s → {a.out}")
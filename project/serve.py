@@ -0,0 +1,33 @@
+import argparse, asyncio, json
+import numpy as np
+from src.config import cfg
+from src.env.buyers import BuyerStore
+from src.env.market_env import MarketplaceEnv
+from src.server import BidServer
+from src.tokens.ledger import SqliteLedger
+
+p = argparse.ArgumentParser(description="Serve a market to external bidding agents over local TCP.")
+p.add_argument("--host", default="127.0.0.1")
+p.add_argument("--port", type=int, default=8765)
+p.add_argument("--buyers", type=int, default=800)
+p.add_argument("--prices", default="10,15,20,25")
+p.add_argument("--epochs", type=int, help="stop after this many epochs (default: run until killed)")
+p.add_argument("--epoch-seconds", type=float, default=1.0, help="bidding window before each closure")
+p.add_argument("--batch-size", type=int, default=4096, help="pending bids that trigger a micro-batch")
+p.add_argument("--batch-interval", type=float, default=0.005, help="max seconds a bid waits for its batch")
+p.add_argument("--vault", help="persist tokens to this SQLite file (default: in memory)")
+a = p.parse_args()
+
+income = np.random.default_rng(cfg.seed).lognormal(3.0, 1.0, a.buyers)
+env = MarketplaceEnv(BuyerStore([f"b{i}" for i in range(a.buyers)], income),
+                     [float(x) for x in a.prices.split(",")], cfg=cfg,
+                     ledger=SqliteLedger(a.vault) if a.vault else None)
+
+async def main():
+    server = await BidServer(env, a.host, a.port, a.epoch_seconds, a.batch_size,
+                             a.batch_interval, a.epochs).start()
+    print(f"serving {a.buyers} buyers on {a.host}:{server.port}", flush=True)
+    await server.run()
+    print(json.dumps(server.metrics(), indent=1))
+
+asyncio.run(main())
@@ -1,9 +1,14 @@
 from typing import List, Tuple, Dict
+import numpy as np
 
 def shapley_reserve(prices, k: int, lam: float) -> float:
     step = prices[k] - (prices[k-1] if k > 0 else 0.0)
     return lam * step
 
+def shapley_reserves(prices: np.ndarray, lam: float) -> np.ndarray:
+    """All K reserves at once; works row-wise on an (N, K) price matrix."""
+    return lam * np.diff(prices, axis=-1, prepend=0.0)
+
 def resolve_tier(bids: List[Tuple[str, float]],
                  reserves: Dict[str, float]) -> Tuple[str, float]:
     """
@@ -14,3 +19,73 @@ def resolve_tier(bids: List[Tuple[str, float]],
     winner, _ = bids[0]
     second = bids[1][1] if len(bids) > 1 else 0.0
     return winner, max(second, reserves[winner])
+
+def clear_tiers(tiers: np.ndarray, bids: np.ndarray,
+                stock: np.ndarray, reserves: np.ndarray):
+    """
+    Multi-unit uniform-price auction, all K tiers in one call.
+
+    Only bids at or above the tier's reserve are eligible.  Tier k sells
+    up to stock[k] units to its highest eligible bids; every winner pays
+    max(reserve, highest losing eligible bid), the (s+1)-th price, which
+    never exceeds its own bid.  For unit-demand bidders the price never
+    depends on a winner's own bid, so truthful bidding stays dominant.
+    With one unit and every bid above the reserve this is `resolve_tier`.
+
+    Args:
+        tiers: tier per bid (entries outside 0..K-1 are ignored)
+        bids: bid per entry
+        stock: units on offer per tier
+        reserves: reserve (payment floor) per tier
+
+    Returns:
+        (winners, payments, units) – indices into `bids`, the price each
+        winner pays, and units sold per tier
+    """
+    K = len(stock)
+    winners, payments = [], []
+    units = np.zeros(K, int)
+    for k in range(K):
+        sel = np.flatnonzero((tiers == k) & (bids >= reserves[k]))
+        s = min(int(stock[k]), sel.size)
+        if s == 0:
+            continue
+        if s < sel.size:                          # top s bids, no full sort
+            part = np.argpartition(-bids[sel], s)
+            win, price = sel[part[:s]], bids[sel[part[s]]]
+        else:
+            win, price = sel, 0.0
+        winners.append(win)
+        payments.append(np.full(s, max(price, reserves[k])))
+        units[k] = s
+    if not winners:
+        return np.empty(0, int), np.empty(0), units
+    return np.concatenate(winners), np.concatenate(payments), units
+
+def clear_tiers_batch(groups: np.ndarray, bids: np.ndarray,
+                      stock: np.ndarray, reserves: np.ndarray):
+    """
+    `clear_tiers` over G independent (market, tier) groups in one sort,
+    with no per-group loop: `groups` holds each bid's group in 0..G-1,
+    `stock` and `reserves` are per group.  Same pricing rule – the top
+    stock[g] eligible (≥ reserve) bids of group g win and pay
+    max(reserve, (s+1)-th eligible bid).
+
+    Returns:
+        (winners, payments, units) as in `clear_tiers`, units per group
+    """
+    G = len(stock)
+    eligible = np.flatnonzero(bids >= reserves[groups])
+    groups, bids = groups[eligible], bids[eligible]
+    order = np.argsort(-bids)                     # best bid first …
+    order = order[np.argsort(groups[order], kind="stable")]   # … within each group
+    g     = groups[order]
+    start = np.searchsorted(g, np.arange(G))
+    rank  = np.arange(len(g)) - start[g]
+    winners = order[rank < stock[g]]
+    count = np.bincount(g, minlength=G)
+    units = np.minimum(stock, count)
+    price = np.zeros(G)
+    cut   = count > stock                         # groups with a highest losing bid
+    price[cut] = bids[order[start[cut] + stock[cut]]]
+    return eligible[winners], np.maximum(price, reserves)[groups[winners]], units
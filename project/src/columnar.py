@@ -0,0 +1,88 @@
+"""
+Chunked columnar output for KPIs and per-agent traces.
+
+`ColumnWriter` buffers rows (dicts) or column blocks (arrays) and flushes
+them as Arrow record batches once `chunk_rows` rows are pending, so memory
+stays bounded however long the run.  The format follows the file suffix:
+
+    .parquet            Parquet, one row group per chunk (column-selectable)
+    .arrow / .feather   Arrow IPC file (memory-mappable with pa.memory_map)
+    .csv                CSV, for quick looks
+
+Read back with `pd.read_parquet(path, columns=[...])` or
+`pa.ipc.open_file(pa.memory_map(path)).read_all()`.
+"""
+import pathlib
+import numpy as np
+import pyarrow as pa
+
+FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow",
+           ".csv": "csv"}
+
+class ColumnWriter:
+    def __init__(self, path, chunk_rows: int = 65_536):
+        self.path = pathlib.Path(path)
+        fmt = FORMATS.get(self.path.suffix.lower())
+        if fmt is None:
+            raise ValueError(f"unsupported output suffix {self.path.suffix!r}; "
+                             f"expected one of {sorted(FORMATS)}")
+        self.fmt, self.chunk_rows = fmt, chunk_rows
+        self.rows_written = 0
+        self._blocks, self._pending = [], 0
+        self._writer = None
+
+    # ---------- input ----------
+    def write(self, rec: dict) -> None:
+        """Append one row."""
+        self.write_columns(**{k: [v] for k, v in rec.items()})
+
+    def write_columns(self, **cols) -> None:
+        """Append a block of rows given as equal-length columns."""
+        block = {k: np.asarray(v) for k, v in cols.items()}
+        self._blocks.append(block)
+        self._pending += len(next(iter(block.values())))
+        if self._pending >= self.chunk_rows:
+            self.flush()
+
+    def write_frame(self, df) -> None:
+        self.write_columns(**{c: df[c].to_numpy() for c in df.columns})
+
+    def write_table(self, table: pa.Table) -> None:
+        self.write_columns(**{c: table.column(c).to_numpy() for c in table.column_names})
+
+    # ---------- output ----------
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        names = list(self._blocks[0])
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(np.concatenate([b[c] for b in self._blocks])) for c in names], names)
+        if self._writer is None:
+            self._writer = self._open(batch.schema)
+        else:
+            batch = batch.cast(self._writer_schema)   # later chunks keep the first one's types
+        self._writer.write_batch(batch)
+        self.rows_written += self._pending
+        self._blocks, self._pending = [], 0
+
+    def _open(self, schema):
+        self._writer_schema = schema
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.path, schema)
+        if self.fmt == "arrow":
+            return pa.ipc.new_file(self.path, schema)
+        import pyarrow.csv as pcsv
+        return pcsv.CSVWriter(self.path, schema)
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
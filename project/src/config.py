@@ -12,6 +12,7 @@ class Config:
     step_size:  float = 0.10 # η in mirrored-descent
     unit_stock: int = 30     # items per tier per epoch
     reserve_floor: bool = True
+    rebate_solver: str = "exact1d"   # or "sinkhorn" (entropic)
     seed: int = 42
 
 cfg = Config()
@@ -0,0 +1,83 @@
+from collections.abc import Mapping, MutableMapping
+import numpy as np
+
+
+class BuyerView(MutableMapping):
+    """Dict-style window onto one row of a BuyerStore (no copy)."""
+    __slots__ = ("_store", "_i")
+    _fields = ("income", "credit")
+
+    def __init__(self, store, i: int):
+        self._store, self._i = store, i
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return float(getattr(self._store, key)[self._i])
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(key)
+        getattr(self._store, key)[self._i] = value
+        self._store.version += 1
+
+    def __delitem__(self, key):
+        raise TypeError("buyer fields cannot be deleted")
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class BuyerStore(Mapping):
+    """
+    Struct-of-arrays buyer state: one float64 column per attribute,
+    indexed by agent position.  `store[aid]` keeps the old dict-of-dicts
+    access pattern working as a thin view on top of the arrays.
+
+    `version` increases on every write made through views or `add_credit`;
+    code writing the arrays directly should call `touch()` afterwards so
+    caches keyed on it (e.g. the env's tier assignment) are refreshed.
+    """
+
+    def __init__(self, ids, income, credit=None):
+        self.ids    = list(ids)
+        self.index  = {a: i for i, a in enumerate(self.ids)}
+        n = len(self.ids)
+        self.income = np.asarray(income, float).reshape(n)
+        self.credit = (np.zeros(n) if credit is None
+                       else np.array(credit, float).reshape(n))
+        self.agent_idx = np.arange(n)
+        self.version   = 0
+
+    @classmethod
+    def from_dict(cls, buyers: dict) -> "BuyerStore":
+        ids = list(buyers.keys())
+        return cls(ids,
+                   [buyers[a]["income"] for a in ids],
+                   [buyers[a].get("credit", 0.0) for a in ids])
+
+    def add_credit(self, idx, amount) -> None:
+        self.credit[idx] += amount
+        self.touch()
+
+    def touch(self) -> None:
+        self.version += 1
+
+    # ---------- Mapping API ----------
+    def __getitem__(self, aid) -> BuyerView:
+        return BuyerView(self, self.index[aid])
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, aid):
+        return aid in self.index
@@ -0,0 +1,95 @@
+"""
+Snapshot / restore of a MarketplaceEnv between epochs.
+
+One uncompressed `.npz` holds the ladder, epoch counters, buyer arrays,
+every live ledger row, the Config and (optionally) a NumPy Generator
+state.  Loading is a handful of array reads, so many what-if branches can
+be forked from one warmed-up state; pass Config overrides to
+`load_checkpoint` to change parameters in the branch.
+
+Margin-policy noise is counter-based (seed, agent, epoch): the policy
+seed and the epoch counter of the next draw are saved alongside (see
+`load_stream`), so a resumed run draws the noise it would have drawn.
+The entropic solver's warm-start cache is not saved; a restored env
+starts it cold.
+"""
+import json, os
+from dataclasses import asdict, replace
+import numpy as np
+from ..config import Config
+from ..tokens.ledger import MemoryLedger
+from .buyers import BuyerStore
+from .market_env import MarketplaceEnv
+
+FORMAT = 1
+
+def save_checkpoint(env: MarketplaceEnv, path, rng: np.random.Generator = None,
+                    seed: int = None, counter: int = None) -> None:
+    """
+    Write `env` (and `rng`, if given) to `path`; only valid between epochs.
+    `seed` is the policy seed and `counter` the Philox epoch counter of the
+    next draw (default: `env.epoch`).  The file is replaced atomically, so
+    a run interrupted while saving keeps its previous checkpoint.
+    """
+    if env._bids:
+        raise ValueError("cannot checkpoint mid-epoch: bids are pending")
+    epochs, donors, tokens = env.ledger.dump()
+    B = env.buyers
+    ids = np.asarray(B.ids)
+    if ids.dtype.kind not in "iu":                 # integer ids keep their dtype
+        ids = ids.astype(str)
+    stream = {"seed": None if seed is None else int(seed),
+              "counter": env.epoch if counter is None else int(counter)}
+    path = os.fspath(path)
+    if not path.endswith(".npz"):                  # as np.savez names it
+        path += ".npz"
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f,
+                 format=FORMAT,
+                 cfg=json.dumps(asdict(env.cfg)),
+                 rng=json.dumps(rng.bit_generator.state if rng is not None else None),
+                 stream=json.dumps(stream),
+                 prices=env.prices,
+                 counters=np.array([env.epoch, env.revenue, env.minted_last, env.expired_last]),
+                 ids=ids,
+                 income=B.income, credit=B.credit,
+                 ledger_epoch=epochs, ledger_donor=donors, ledger_tokens=tokens)
+    os.replace(tmp, path)
+
+def load_checkpoint(path, ledger=None, **overrides):
+    """
+    Rebuild an env from `path`.  `overrides` replace saved Config fields
+    (e.g. lambda_=0.4 for a what-if branch); `ledger` defaults to a fresh
+    MemoryLedger and receives the saved rows.
+
+    Returns (env, rng) – rng is None unless one was saved.
+    """
+    with np.load(path, allow_pickle=False) as z:
+        if int(z["format"]) != FORMAT:
+            raise ValueError(f"unsupported checkpoint format {int(z['format'])}")
+        cfg = replace(Config(**json.loads(str(z["cfg"]))), **overrides)
+        buyers = BuyerStore(z["ids"].tolist(), z["income"], z["credit"])
+        ledger = ledger if ledger is not None else MemoryLedger(cfg.token_expiry)
+        ledger.load_rows(z["ledger_epoch"], z["ledger_donor"], z["ledger_tokens"])
+        env = MarketplaceEnv(buyers, z["prices"], ledger=ledger, cfg=cfg)
+        epoch, env.revenue, env.minted_last, env.expired_last = z["counters"]
+        env.epoch = int(epoch)
+        state = json.loads(str(z["rng"]))
+    rng = None
+    if state is not None:
+        rng = np.random.Generator(getattr(np.random, state["bit_generator"])())
+        rng.bit_generator.state = state
+    return env, rng
+
+def load_stream(path):
+    """
+    (policy seed, Philox epoch counter) saved with the checkpoint at `path`;
+    the seed is None if none was saved (or the file predates it), and the
+    counter then falls back to the saved epoch.
+    """
+    with np.load(path, allow_pickle=False) as z:
+        if "stream" not in z.files:
+            return None, int(z["counters"][0])
+        stream = json.loads(str(z["stream"]))
+    return stream["seed"], stream["counter"]
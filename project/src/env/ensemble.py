@@ -0,0 +1,171 @@
+"""
+S independent markets advanced in lockstep on a leading scenario axis.
+
+Prices are (S, K) and buyer income/credit (S, N); one closure clears all
+S·K tiers in a single sort, assigns tiers, computes Gini and projects the
+ladders for every scenario at once.  Per-scenario Config fields
+(SCENARIO_FIELDS) become (S, 1) arrays on a stacked Config, so the
+scalar formulas in `ladder.update_prices` broadcast unchanged.
+
+Each scenario follows the same rules as a MarketplaceEnv with an
+in-memory ledger; only the OT rebate still runs per scenario.
+"""
+from dataclasses import fields, replace
+import numpy as np
+from ..auction.premium import shapley_reserves, clear_tiers_batch
+from ..config import Config
+from ..fairness.ot_rebate import rebate
+from ..ladder import gini_batch, update_prices
+from .market_env import POVERTY_LINE
+from .metrics import EpochMetrics
+
+SCENARIO_FIELDS = ("lambda_", "beta", "zeta", "gini_target", "step_size")
+
+def stack_configs(cfgs) -> Config:
+    """
+    One Config for S scenarios: SCENARIO_FIELDS become (S, 1) arrays, every
+    other field must agree across `cfgs` (seed is ignored).
+    """
+    cfgs = list(cfgs)
+    shared = {}
+    for f in fields(Config):
+        if f.name in SCENARIO_FIELDS or f.name == "seed":
+            continue
+        vals = {getattr(c, f.name) for c in cfgs}
+        if len(vals) > 1:
+            raise ValueError(f"Config.{f.name} must be the same in every scenario, got {sorted(vals)}")
+        shared[f.name] = vals.pop()
+    per = {name: np.array([float(getattr(c, name)) for c in cfgs])[:, None]
+           for name in SCENARIO_FIELDS}
+    return Config(**shared, **per)
+
+class EnsembleEnv:
+    def __init__(self, income, init_prices, cfgs):
+        self.income = np.array(income, float)
+        S, N = self.income.shape
+        if isinstance(cfgs, Config):
+            cfgs = [cfgs] * S
+        if len(cfgs) != S:
+            raise ValueError(f"{len(cfgs)} configs for {S} scenarios")
+        self.S, self.N = S, N
+        self.cfg    = stack_configs(cfgs)
+        self.credit = np.zeros((S, N))
+        self.prices = np.array(np.broadcast_to(np.asarray(init_prices, float),
+                                               (S, np.shape(init_prices)[-1])))
+        K = self.prices.shape[1]
+        # policies see flat (S·N, K+2) rows, so their λ is repeated per row
+        self.row_cfg = replace(self.cfg, lambda_=np.repeat(self.cfg.lambda_, N, axis=0))
+        self.epoch = 0
+        # dense vault: tokens minted per (slot, scenario, donor), a ring of expiry+1 epochs
+        n = self.cfg.token_expiry + 1
+        self._vault       = np.zeros((n, S, N))
+        self._vault_epoch = np.full(n, -1, np.int64)
+        self._obs_buf = np.empty((S * N, K + 2))
+        self.metrics = None      # EpochMetrics of the last closure, (S, ...) fields
+        self.reset()
+
+    def reset(self):
+        S, K = self.prices.shape
+        self.stock   = np.full((S, K), self.cfg.unit_stock, int)
+        self.sales   = np.zeros((S, K))
+        self.revenue = np.zeros(S)
+        self.minted_last  = np.zeros(S)
+        self.expired_last = np.zeros(S)
+
+    def observations(self) -> np.ndarray:
+        """(S·N, K+2) observation matrix, scenario-major rows."""
+        K = self.prices.shape[1]
+        obs = self._obs_buf.reshape(self.S, self.N, K + 2)
+        obs[..., :K]  = self.prices[:, None, :]
+        obs[..., K]   = self.income
+        obs[..., K+1] = self.credit
+        return self._obs_buf
+
+    def step_batch(self, tiers, bids) -> np.ndarray:
+        """
+        One (tier, bid) per row of `observations()` (flat or (S, N));
+        clears every market, runs the closure and returns new observations.
+        """
+        S, K = self.prices.shape
+        tiers, bids = np.ravel(tiers), np.ravel(np.asarray(bids, float))
+        sel = np.flatnonzero((tiers >= 0) & (tiers < K))
+        groups = (sel // self.N) * K + tiers[sel]             # (scenario, tier) → s·K + k
+        keep = self.stock.ravel()[groups] > 0
+        self._nightly_closure(sel[keep], groups[keep], bids[sel[keep]])
+        return self.observations()
+
+    def _nightly_closure(self, rows, groups, bids):
+        cfg, S, N = self.cfg, self.S, self.N
+        K = self.prices.shape[1]
+
+        # 1. all S·K auctions in one clearing
+        win, prem, units = clear_tiers_batch(groups, bids, self.stock.ravel(),
+                                             shapley_reserves(self.prices, cfg.lambda_).ravel())
+        units = units.reshape(S, K)
+        self.stock   -= units
+        self.sales   += units
+        self.revenue += (units * self.prices).sum(axis=1)
+        slot = self.epoch % len(self._vault_epoch)
+        evicted = np.zeros(S)                     # reused slot: its tokens count as expired
+        if self._vault_epoch[slot] != self.epoch:
+            evicted = self._vault[slot].sum(axis=1)
+            self._vault[slot] = 0.0
+            self._vault_epoch[slot] = self.epoch
+        s, i = np.divmod(rows[win], N)
+        self._vault[slot, s, i] += prem                     # one win per buyer per epoch
+        self.minted_last += np.bincount(s, weights=prem, minlength=S)
+
+        # 2. OT rebate, per scenario
+        live = self._vault_epoch >= self.epoch - cfg.token_expiry
+        tokens = self._vault[live].sum(axis=0)
+        issued = np.zeros(S)
+        for s in np.flatnonzero(tokens.sum(axis=1) > 0):
+            donors  = np.flatnonzero(tokens[s])
+            rec_idx = np.flatnonzero(self.income[s] < POVERTY_LINE)
+            if rec_idx.size:
+                credits = rebate(self.income[s, donors], tokens[s, donors],
+                                 self.income[s, rec_idx], solver=cfg.rebate_solver)
+                self.credit[s, rec_idx] += credits
+                issued[s] = credits.sum()
+        old = (self._vault_epoch >= 0) & (self._vault_epoch < self.epoch - cfg.token_expiry)
+        self.expired_last = evicted + self._vault[old].sum(axis=(0, 2))
+        self._vault[old] = 0.0
+        self._vault_epoch[old] = -1
+
+        # 3. adapt every ladder
+        tiers, eff = self.tier_assignment()
+        g    = gini_batch(np.where(tiers >= 0, eff, np.nan))
+        sold = 1 - self.stock.sum(axis=1) / (cfg.unit_stock * cfg.K)
+        self.prices = update_prices(self.prices, self.sales, self.revenue,
+                                    g[:, None], sold[:, None], cfg)
+
+        snap = dict(revenue=self.revenue, gini=g, sales=self.sales.astype(int),
+                    sell_through=sold, token_balance=self.balance(self.epoch + 1),
+                    minted=self.minted_last, expired=self.expired_last,
+                    credits_issued=issued, prices=self.prices)
+        snap = {k: np.array(v) for k, v in snap.items()}       # copies, frozen below
+        for v in snap.values():
+            v.setflags(write=False)
+        self.metrics = EpochMetrics(epoch=self.epoch, **snap)
+        self.sales[:] = 0
+        self.epoch += 1
+
+    def tier_assignment(self):
+        """
+        (S, N) highest affordable tier and effective price per buyer, as
+        `MarketplaceEnv.tier_assignment` (-1 / NaN when priced out).
+        """
+        p, K = self.prices, self.prices.shape[1]
+        ok = (self.income + self.credit)[..., None] >= p[:, None, :]   # (S, N, K)
+        tiers = np.where(ok.any(axis=-1), K - 1 - ok[..., ::-1].argmax(axis=-1), -1)
+        eff = np.where(tiers >= 0,
+                       np.maximum(np.take_along_axis(p, np.maximum(tiers, 0), axis=1)
+                                  - self.credit, 0.0),
+                       np.nan)
+        return tiers, eff
+
+    def balance(self, epoch: int = None) -> np.ndarray:
+        """Live vault tokens per scenario at `epoch` (default: now), as `Ledger.balance`."""
+        epoch = self.epoch if epoch is None else epoch
+        live = self._vault_epoch >= epoch - self.cfg.token_expiry
+        return self._vault[live].sum(axis=(0, 2))
@@ -1,109 +1,216 @@
 import numpy as np
 from pettingzoo import ParallelEnv
 from gymnasium import spaces
-from collections import defaultdict
-from ..auction.premium import shapley_reserve, resolve_tier
-from ..tokens import ledger
+from ..auction.premium import shapley_reserves, clear_tiers
+from ..tokens.ledger import MemoryLedger
 from ..ladder import gini, update_prices
-from ..fairness.ot_rebate import rebate
-from ..config import cfg, rng
+from ..fairness.ot_rebate import rebate, SinkhornRebate
+from ..config import cfg
+from .buyers import BuyerStore
+from .metrics import EpochMetrics
+from .profiling import ClosureProfile
 
 POVERTY_LINE = 1e4  # €10k income
 
+def assign_tiers(prices, income, credit):
+    """
+    Highest tier each buyer can afford (income ≥ price − credit) and its
+    effective price, vectorised over buyers.  Returns (tiers, eff); tier
+    -1 / eff NaN means priced out of every tier.  Credit beyond the price
+    is not paid out, so eff is clamped at 0.
+    """
+    p = prices
+    if np.all(np.diff(p) >= 0):
+        tiers = np.searchsorted(p, income + credit, side="right") - 1
+    else:                                            # unsorted ladder: scan all tiers
+        ok = income[:, None] >= p[None, :] - credit[:, None]
+        tiers = np.where(ok.any(axis=1), len(p) - 1 - ok[:, ::-1].argmax(axis=1), -1)
+    eff = np.where(tiers >= 0, np.maximum(p[np.maximum(tiers, 0)] - credit, 0.0), np.nan)
+    return tiers, eff
+
 class MarketplaceEnv(ParallelEnv):
     metadata = {"name": "S-TASSEL-v0"}
 
-    def __init__(self, buyers, init_prices):
-        self.buyers = buyers
+    def __init__(self, buyers, init_prices, ledger=None, cfg=cfg, profile=False):
+        self.cfg    = cfg
+        # per-phase closure timings/counters; None keeps the closure uninstrumented
+        self.profile = ClosureProfile() if profile else None
+        self.ledger = ledger if ledger is not None else MemoryLedger(cfg.token_expiry)
+        # entropic mode keeps dual potentials across closures for warm starts
+        self.rebate_solver = SinkhornRebate() if cfg.rebate_solver == "sinkhorn" else None
+        self.buyers = (buyers if isinstance(buyers, BuyerStore)
+                       else BuyerStore.from_dict(buyers))
         self.prices = np.array(init_prices, float)
-        self.agents = list(buyers.keys())
+        self.agents = self.buyers.ids
         self.epoch  = 0
         K = len(self.prices)
-        self.action_spaces = {a: spaces.Tuple(
-            (spaces.Discrete(K+1), spaces.Box(0, 10, (1,))))
-                              for a in self.agents}
+        # one preallocated (N, K+2) matrix; per-agent observations are row views
+        self._obs_buf = np.empty((len(self.agents), K + 2))
+        self._tiers_key = None
+        self.metrics = None      # EpochMetrics of the last closure
+        # every agent has the same spaces: share one instance instead of N copies
+        act_space = spaces.Tuple((spaces.Discrete(K+1), spaces.Box(0, 10, (1,))))
         obs_len = K + 2
-        self.observation_spaces = {a: spaces.Box(0, 1e6, (obs_len,)) for a in self.agents}
+        obs_space = spaces.Box(0, 1e6, (obs_len,))
+        self.action_spaces      = dict.fromkeys(self.agents, act_space)
+        self.observation_spaces = dict.fromkeys(self.agents, obs_space)
         self._reset_day()
 
     # ---------- PettingZoo API ----------
     def reset(self, seed=None, options=None):
         self._reset_day()
-        return {a: self._obs(a) for a in self.agents}, {a: {} for a in self.agents}
+        return self._obs_dict(), {a: {} for a in self.agents}
 
     def step(self, actions):
         rewards, terms, truncs = {}, {}, {}
+        idx, tiers, bids = [], [], []
         for aid, (tier, bid) in actions.items():
+            rewards[aid] = 0.; terms[aid]=truncs[aid]=True
             if tier == len(self.prices) or self.stock[tier] == 0:
-                rewards[aid] = 0.; terms[aid]=truncs[aid]=True
                 continue
-            self.bids[tier].append((aid, float(bid)))
-            rewards[aid] = 0.; terms[aid]=truncs[aid]=True
+            idx.append(self.buyers.index[aid]); tiers.append(tier); bids.append(float(bid))
+        self._bids.append((np.array(idx, int), np.array(tiers, int), np.array(bids)))
         if all(terms.values()):
             self._nightly_closure()
-        return {a: self._obs(a) for a in self.agents}, rewards, terms, truncs, {}
+        return self._obs_dict(), rewards, terms, truncs, {}
+
+    def step_batch(self, tiers, bids) -> np.ndarray:
+        """
+        Array counterpart of `step`: one (tier, bid) per agent in
+        `self.agents` order, as returned by the policies' `act_batch`.
+        Runs the nightly closure and returns the new observation matrix.
+        """
+        self.submit(np.arange(len(self.agents)), tiers, bids)
+        self._nightly_closure()
+        return self.observations()
+
+    def submit(self, idx, tiers, bids) -> int:
+        """
+        Queue bids for tonight without closing the epoch: agent indices
+        (into `self.agents`), tiers and bids.  Bids on walk-away or
+        sold-out tiers are dropped; returns how many were kept.  Raises
+        ValueError for an index out of range or one that already bid
+        tonight (in this call or an earlier one).
+        """
+        idx, tiers, bids = np.asarray(idx, int), np.asarray(tiers), np.asarray(bids, float)
+        if idx.size and (idx.min() < 0 or idx.max() >= len(self.agents)):
+            raise ValueError(f"agent index out of range [0, {len(self.agents)})")
+        if len(np.unique(idx)) < len(idx) or self._bid_on[idx].any():
+            raise ValueError("duplicate bids: one bid per agent per epoch")
+        sel = np.flatnonzero((tiers >= 0) & (tiers < len(self.prices)))
+        sel = sel[self.stock[tiers[sel]] > 0]
+        self._bid_on[idx[sel]] = True
+        self._bids.append((idx[sel], tiers[sel], bids[sel]))
+        return len(sel)
+
+    def close_epoch(self) -> None:
+        """Run the nightly closure on everything submitted since `reset`."""
+        self._nightly_closure()
+
+    def observations(self) -> np.ndarray:
+        """Current (N, K+2) observation matrix, rows in `self.agents` order."""
+        self._refresh_obs()
+        return self._obs_buf
 
     # ---------- internal helpers ----------
     def _reset_day(self):
         K = len(self.prices)
-        self.stock = np.ones(K, int) * cfg.unit_stock
+        self.stock = np.ones(K, int) * self.cfg.unit_stock
         self.sales = np.zeros(K)
-        self.bids  = defaultdict(list)
-        for b in self.buyers.values():
-            b["credit"] = b.get("credit", 0.0)
+        self._bids = []          # (agent idx, tier, bid) array chunks for tonight
+        self._bid_on = np.zeros(len(self.agents), bool)   # agents with a queued bid
         self.revenue = 0.
         self.minted_last  = 0.0  # tokens minted in last closure
         self.expired_last = 0.0  # tokens expired in last closure
 
+    def _refresh_obs(self):
+        K = len(self.prices)
+        self._obs_buf[:, :K]  = self.prices
+        self._obs_buf[:, K]   = self.buyers.income
+        self._obs_buf[:, K+1] = self.buyers.credit
+
+    def _obs_dict(self):
+        # views into _obs_buf: valid until the next reset/step rewrites it
+        self._refresh_obs()
+        return dict(zip(self.agents, self._obs_buf))
+
     def _obs(self, aid):
-        inc  = self.buyers[aid]["income"]
-        cred = self.buyers[aid]["credit"]
-        return np.concatenate([self.prices, [inc, cred]])
+        self._refresh_obs()
+        return self._obs_buf[self.buyers.index[aid]]
 
     def _nightly_closure(self):
-        # 1. resolve auctions
-        for k, bids in self.bids.items():
-            if not bids:
-                continue
-            reserves = {a: shapley_reserve(self.prices, k, cfg.lambda_) for a,_ in bids}
-            winner, prem = resolve_tier(bids, reserves)
-            if winner:                           # winner cannot be None here
-                self.stock[k] -= 1
-                self.sales[k] += 1
-                self.revenue += self.prices[k]
-                ledger.mint(self.epoch, winner, prem)
-                self.minted_last += prem
+        prof = self.profile
+        if prof: prof.start()
+
+        # 1. resolve auctions – every tier in one multi-unit clearing
+        if self._bids:
+            idx, tiers, bids = (np.concatenate(c) for c in zip(*self._bids))
+            win, prem, units = clear_tiers(tiers, bids, self.stock,
+                                           shapley_reserves(self.prices, self.cfg.lambda_))
+            self.stock -= units
+            self.sales += units
+            self.revenue += float(units @ self.prices)
+            if prof: prof.lap("auction"); prof.count(n_bids=len(bids), n_winners=len(win))
+            self.ledger.mint_many(self.epoch, idx[win], prem)
+            self.minted_last += float(prem.sum())
+            if prof: prof.lap("mint")
 
         # 2. OT rebate
-        rows = ledger.load(self.epoch, cfg.token_expiry)
-        if rows:
-            donor_tok = np.array([t for _, t in rows])
-            rec_ids = [a for a in self.agents if self.buyers[a]["income"] < POVERTY_LINE]
+        issued = 0.0
+        donor_idx, donor_tok = self.ledger.load(self.epoch, self.cfg.token_expiry)
+        if prof: prof.lap("load"); prof.count(n_donors=len(donor_idx))
+        if donor_idx.size:
+            B = self.buyers
+            rec_idx = np.flatnonzero(B.income < POVERTY_LINE)
+            if prof: prof.count(n_recipients=len(rec_idx))
 
             # Skip OT call when no tokens to redistribute or no recipients
-            if donor_tok.sum() > 0 and rec_ids:
-                donor_inc = np.array([self.buyers[d]["income"] for d, _ in rows])
-                recip_inc = np.array([self.buyers[r]["income"] for r in rec_ids])
-                credits = rebate(donor_inc, donor_tok, recip_inc)
-                for rid, c in zip(rec_ids, credits):
-                    self.buyers[rid]["credit"] += c
-        self.expired_last = ledger.expire(self.epoch, cfg.token_expiry)
+            if donor_tok.sum() > 0 and rec_idx.size:
+                donor_inc, rec_inc = B.income[donor_idx], B.income[rec_idx]
+                if self.rebate_solver is not None:
+                    credits = self.rebate_solver(donor_inc, donor_tok, rec_inc,
+                                                 donor_idx, rec_idx)
+                else:
+                    credits = rebate(donor_inc, donor_tok, rec_inc, solver=self.cfg.rebate_solver)
+                B.add_credit(rec_idx, credits)
+                issued = float(np.sum(credits))
+                if prof and self.rebate_solver is not None:
+                    prof.count(solver_iters=self.rebate_solver.last.n_iter)
+        if prof: prof.lap("rebate")
+        self.expired_last = self.ledger.expire(self.epoch, self.cfg.token_expiry)
+        balance = self.ledger.balance(self.epoch + 1, self.cfg.token_expiry)
+        if prof: prof.lap("expire")
 
         # 3. adapt ladder
-        eff = np.array([self.prices[self._tier(a)] - self.buyers[a]["credit"]
-                        for a in self.agents if self._tier(a) is not None])
-        g    = gini(eff)
-        sold = 1 - self.stock.sum() / (cfg.unit_stock * cfg.K)
-        self.prices = update_prices(self.prices, self.sales, self.revenue, g, sold, cfg)
+        tiers, eff = self.tier_assignment()
+        g    = gini(eff[tiers >= 0])
+        if prof: prof.lap("gini")
+        sold = 1 - self.stock.sum() / (self.cfg.unit_stock * self.cfg.K)
+        self.prices = update_prices(self.prices, self.sales, self.revenue, g, sold, self.cfg)
+        if prof: prof.lap("ladder")
 
-        # 4. reset day
+        # 4. publish the epoch's metrics, reset day
+        self.metrics = EpochMetrics(
+            epoch=self.epoch, revenue=float(self.revenue), gini=float(g),
+            sales=tuple(int(s) for s in self.sales), sell_through=float(sold),
+            token_balance=balance, minted=self.minted_last, expired=self.expired_last,
+            credits_issued=issued, prices=tuple(self.prices.tolist()))
         self.sales[:] = 0
-        self.bids.clear()
+        self._bids.clear()
+        self._bid_on[:] = False
         self.epoch += 1
 
+    def tier_assignment(self):
+        """
+        `assign_tiers` for all agents: (tiers, eff), tier -1 / eff NaN when
+        priced out.  Cached until the ladder or any credit changes.
+        """
+        key = (self.prices.tobytes(), self.buyers.version)
+        if self._tiers_key != key:
+            B = self.buyers
+            self._tiers, self._tiers_key = assign_tiers(self.prices, B.income, B.credit), key
+        return self._tiers
+
     def _tier(self, aid):
-        inc, cred = self.buyers[aid]["income"], self.buyers[aid]["credit"]
-        for k in range(len(self.prices)-1, -1, -1):
-            if inc >= self.prices[k] - cred:
-                return k
-        return None
+        k = self.tier_assignment()[0][self.buyers.index[aid]]
+        return None if k < 0 else int(k)
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class EpochMetrics:
+    """
+    What one nightly closure did, built once at its end and published as
+    `env.metrics`; consumers read it instead of re-deriving KPIs.
+
+    `gini` is the Gini of effective prices the ladder update used (after
+    tonight's rebate, under the ladder that was in force); `token_balance`
+    is the live vault as of the next epoch.  `EnsembleEnv` publishes the
+    same record with a leading scenario axis on every field (read-only
+    arrays instead of scalars and tuples).
+    """
+    epoch: int
+    revenue: float
+    gini: float
+    sales: tuple               # units sold per tier
+    sell_through: float        # share of tonight's stock sold
+    token_balance: float
+    minted: float
+    expired: float
+    credits_issued: float      # rebate credits paid out tonight
+    prices: tuple              # ladder after the update
+
+    def record(self) -> dict:
+        """Flat KPI row: scalar fields, then sold<k> and p<k> per tier."""
+        rec = {"epoch": self.epoch, "revenue": self.revenue, "gini": self.gini,
+               "token_balance": self.token_balance, "minted": self.minted,
+               "expired": self.expired, "credits_issued": self.credits_issued,
+               "sell_through": self.sell_through}
+        rec.update({f"sold{k}": s for k, s in enumerate(self.sales)})
+        rec.update({f"p{k}": p for k, p in enumerate(self.prices)})
+        return rec
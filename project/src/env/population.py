@@ -0,0 +1,168 @@
+"""
+Out-of-core market for national-scale populations.
+
+Buyer income and credit live in `.npy` files opened as memory maps, and
+every pass over the population – observations and bids, rebates, tier
+assignment, Gini – walks them in fixed-size chunks, so resident memory
+depends on `chunk`, not on N.
+
+Per epoch:  reset() → for each chunk: observations(sl) → policy →
+submit(sl, tiers, bids) → close_epoch().
+
+Exactness vs MarketplaceEnv: auctions are exact (each tier only needs
+its top stock+1 bids, kept as a running shortlist); the exact1d rebate is
+exact, since with equal-weight recipients the 1-D plan hands every
+recipient mass/m; Gini comes from a `ladder.GiniSketch` with a reported
+error bound (zero whenever the effective prices are few distinct values,
+as with credits from the equal-split rebate).
+"""
+import pathlib
+import numpy as np
+from numpy.lib.format import open_memmap
+from ..auction.premium import shapley_reserves, clear_tiers
+from ..config import cfg
+from ..ladder import GiniSketch, update_prices
+from ..tokens.ledger import MemoryLedger
+from .market_env import POVERTY_LINE, assign_tiers
+from .metrics import EpochMetrics
+
+def create_population(path, n: int, income_mu: float = 3.0, income_sigma: float = 1.0,
+                      seed: int = 42, chunk: int = 1_000_000):
+    """
+    Write income.npy (lognormal, the same draws as `simulate` for this
+    seed) and a zero credit.npy under directory `path`, chunk by chunk.
+    Returns the two arrays as writable memory maps.
+    """
+    path = pathlib.Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    income = open_memmap(path / "income.npy", "w+", float, (n,))
+    credit = open_memmap(path / "credit.npy", "w+", float, (n,))
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        income[start:stop] = rng.lognormal(income_mu, income_sigma, stop - start)
+        credit[start:stop] = 0.0
+    return income, credit
+
+def open_population(path, mode: str = "r+"):
+    """(income, credit) memory maps of a population written by `create_population`."""
+    path = pathlib.Path(path)
+    return (np.load(path / "income.npy", mmap_mode="r"),
+            np.load(path / "credit.npy", mmap_mode=mode))
+
+class PopulationEnv:
+    def __init__(self, income, credit, init_prices, chunk: int = 1_000_000,
+                 ledger=None, cfg=cfg, gini_bins: int = 4096):
+        if cfg.rebate_solver != "exact1d":
+            raise ValueError("out-of-core mode supports rebate_solver='exact1d' only")
+        self.cfg    = cfg
+        self.income, self.credit = income, credit
+        self.N      = len(income)
+        self.chunk  = chunk
+        self.prices = np.array(init_prices, float)
+        self.ledger = ledger if ledger is not None else MemoryLedger(cfg.token_expiry)
+        self.gini_bins = gini_bins
+        self.epoch  = 0
+        self._obs_buf = np.empty((min(chunk, self.N), len(self.prices) + 2))
+        # one streaming pass for the static recipient count and the credit range
+        self.n_recipients, self.credit_max = 0, 0.0
+        for sl in self.chunks():
+            self.n_recipients += int(np.count_nonzero(self.income[sl] < POVERTY_LINE))
+            self.credit_max = max(self.credit_max, float(self.credit[sl].max()))
+        self.gini_error = 0.0
+        self.metrics = None      # EpochMetrics of the last closure
+        self.reset()
+
+    def chunks(self):
+        for start in range(0, self.N, self.chunk):
+            yield slice(start, min(start + self.chunk, self.N))
+
+    def reset(self):
+        K = len(self.prices)
+        self.stock = np.ones(K, int) * self.cfg.unit_stock
+        self.sales = np.zeros(K)
+        self.revenue = 0.
+        self.minted_last  = 0.0
+        self.expired_last = 0.0
+        # running shortlist: the best stock+1 bids per tier seen so far
+        self._short = (np.empty(0, np.int64), np.empty(0, int), np.empty(0))
+
+    def observations(self, sl: slice) -> np.ndarray:
+        """(chunk, K+2) observation rows for buyers in `sl` (buffer reused per call)."""
+        K = len(self.prices)
+        obs = self._obs_buf[:sl.stop - sl.start]
+        obs[:, :K]  = self.prices
+        obs[:, K]   = self.income[sl]
+        obs[:, K+1] = self.credit[sl]
+        return obs
+
+    def submit(self, sl: slice, tiers, bids) -> None:
+        """Bids of the buyers in `sl`; only each tier's top stock+1 are kept."""
+        tiers, bids = np.asarray(tiers), np.asarray(bids, float)
+        sel = np.flatnonzero((tiers >= 0) & (tiers < len(self.prices)))
+        sel = sel[self.stock[tiers[sel]] > 0]
+        idx, t, b = (np.concatenate(x) for x in zip(self._short, (sel + sl.start, tiers[sel], bids[sel])))
+        order = np.argsort(-b)
+        order = order[np.argsort(t[order], kind="stable")]
+        t_sorted = t[order]
+        rank = np.arange(len(order)) - np.searchsorted(t_sorted, t_sorted)
+        keep = order[rank <= self.stock[t_sorted]]
+        self._short = (idx[keep], t[keep], b[keep])
+
+    def close_epoch(self) -> None:
+        cfg = self.cfg
+
+        # 1. auctions on the shortlist – same winners and prices as on all bids
+        idx, tiers, bids = self._short
+        if len(bids):
+            win, prem, units = clear_tiers(tiers, bids, self.stock,
+                                           shapley_reserves(self.prices, cfg.lambda_))
+            self.stock -= units
+            self.sales += units
+            self.revenue += float(units @ self.prices)
+            self.ledger.mint_many(self.epoch, idx[win], prem)
+            self.minted_last += float(prem.sum())
+
+        # 2. rebate: equal-weight recipients each receive mass / m
+        _, donor_tok = self.ledger.load(self.epoch, cfg.token_expiry)
+        mass = float(donor_tok.sum())
+        share = mass / self.n_recipients if self.n_recipients and mass >= 1e-9 else 0.0
+        issued = share * self.n_recipients
+        if share:
+            for sl in self.chunks():
+                credit = self.credit[sl]
+                credit[self.income[sl] < POVERTY_LINE] += share
+            self.credit_max += share
+        self.expired_last = self.ledger.expire(self.epoch, cfg.token_expiry)
+        balance = self.ledger.balance(self.epoch + 1, cfg.token_expiry)
+
+        # 3. adapt ladder
+        g    = self.gini()
+        sold = 1 - self.stock.sum() / (cfg.unit_stock * cfg.K)
+        self.prices = update_prices(self.prices, self.sales, self.revenue, g, sold, cfg)
+
+        self.metrics = EpochMetrics(
+            epoch=self.epoch, revenue=float(self.revenue), gini=float(g),
+            sales=tuple(int(s) for s in self.sales), sell_through=float(sold),
+            token_balance=balance, minted=self.minted_last, expired=self.expired_last,
+            credits_issued=issued, prices=tuple(self.prices.tolist()))
+        self.sales[:] = 0
+        self._short = (np.empty(0, np.int64), np.empty(0, int), np.empty(0))
+        self.epoch += 1
+
+    def tier_assignment(self, sl: slice):
+        """(tiers, eff) for the buyers in `sl`, by `assign_tiers`."""
+        return assign_tiers(self.prices, self.income[sl], self.credit[sl])
+
+    def gini(self) -> float:
+        """
+        Gini of effective prices over the whole population, one chunked
+        pass; its error bound is left in `gini_error`.
+        """
+        sketch = GiniSketch(max(self.prices.min() - self.credit_max, 0.0), self.prices.max(),
+                            self.gini_bins)
+        for sl in self.chunks():
+            tiers, eff = self.tier_assignment(sl)
+            sketch.add(eff[tiers >= 0])
+        self.gini_error = sketch.error()
+        return sketch.value()
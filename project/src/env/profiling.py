@@ -0,0 +1,34 @@
+import time
+
+PHASES = ("auction", "mint", "load", "rebate", "expire", "gini", "ladder")
+
+class ClosureProfile:
+    """
+    Wall time per `_nightly_closure` phase plus counters, for the last
+    closure only.  The env holds `None` instead of a profile when
+    profiling is off, so the disabled path is one attribute test per phase.
+    """
+
+    def __init__(self):
+        self.times  = dict.fromkeys(PHASES, 0.0)
+        self.counts = {}
+        self._t = 0.0
+
+    def start(self) -> None:
+        self.times  = dict.fromkeys(PHASES, 0.0)
+        self.counts = {"n_bids": 0, "n_winners": 0, "n_donors": 0,
+                       "n_recipients": 0, "solver_iters": 0}
+        self._t = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """Charge the time since the previous lap to `phase`."""
+        t = time.perf_counter()
+        self.times[phase] += t - self._t
+        self._t = t
+
+    def count(self, **counters) -> None:
+        self.counts.update(counters)
+
+    def record(self) -> dict:
+        """Flat KPI columns: t_<phase> seconds and the counters."""
+        return {**{f"t_{p}": v for p, v in self.times.items()}, **self.counts}
@@ -1,28 +1,130 @@
-import numpy as np, ot
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+
+SOLVERS = ("exact1d", "sinkhorn")
+
+@dataclass(frozen=True)
+class SolveStats:
+    n_iter: int            # Sinkhorn iterations run
+    marginal_err: float    # ‖γ1 - a‖₁ + ‖γᵀ1 - b‖₁ of the returned plan
+    wall: float            # seconds in the solver
+    warm: bool             # started from cached potentials
+
+def transport_plan_1d(x: np.ndarray, a: np.ndarray,
+                      y: np.ndarray, b: np.ndarray):
+    """
+    Exact optimal plan for cost |x - y| between weights a on x and b on y
+    (equal total mass): the monotone coupling of the two sorted CDFs.
+    O((n+m) log(n+m)), no dense matrix.  Returns sparse (i, j, mass).
+    """
+    ix, iy = np.argsort(x, kind="stable"), np.argsort(y, kind="stable")
+    ca, cb = np.cumsum(a[ix]), np.cumsum(b[iy])
+    ca[-1] = cb[-1] = max(ca[-1], cb[-1])        # absorb rounding drift
+    t = np.union1d(ca, cb)                       # merged CDF breakpoints
+    w = np.diff(t, prepend=0.0)
+    keep = w > 0
+    t, w = t[keep], w[keep]
+    i = ix[np.minimum(np.searchsorted(ca, t), len(ca) - 1)]
+    j = iy[np.minimum(np.searchsorted(cb, t), len(cb) - 1)]
+    return i, j, w
 
 def rebate(donor_income: np.ndarray,
            donor_tokens: np.ndarray,
            recip_income: np.ndarray,
-           eps: float = 1e-3) -> np.ndarray:
+           eps: float = 1e-3,
+           solver: str = "exact1d") -> np.ndarray:
     """
     Return € credit per recipient (same order as recip_income).
     Vectorised, safe against zero-mass and huge distances.
+
+    solver="exact1d" (default) solves the 1-D problem exactly from sorted
+    CDFs; solver="sinkhorn" keeps the entropic-regularised dense solve.
     """
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver!r}; expected one of {SOLVERS}")
+
     # ------------- early-exit on zero mass -------------
     mass = donor_tokens.sum()
     if mass < 1e-9 or len(recip_income) == 0:
         return np.zeros_like(recip_income, dtype=float)
 
-    # ------------- rescale incomes to [0, 1] -----------
-    scale = max(donor_income.max(), recip_income.max())
-    d = donor_income / scale
-    r = recip_income / scale
-
     a = donor_tokens / mass                       # probability on donors
-    b = np.ones(len(r)) / len(r)                 # equal weight recipients
-    M = ot.utils.dist(d[:, None], r[:, None], metric="euclidean")
+    b = np.ones(len(recip_income)) / len(recip_income)   # equal weight recipients
+
+    if solver == "exact1d":
+        _, j, w = transport_plan_1d(donor_income, a, recip_income, b)
+        return np.bincount(j, weights=w, minlength=len(b)) * mass
+
+    return SinkhornRebate(cache_size=0)(donor_income, donor_tokens, recip_income)
+
+class SinkhornRebate:
+    """
+    Entropic rebate with warm starts across epochs.
+
+    Dual potentials are cached per recipient set (LRU, `cache_size`
+    entries) together with the donor ids they were solved for; the next
+    call on the same recipients starts from them.  Potentials are kept in
+    income units so they survive a change of the [0, 1] rescaling.
+    Per-call `SolveStats` land in `last` and `history`.
+    """
+
+    def __init__(self, reg: float = 5e-3, max_iter: int = 5000, cache_size: int = 8):
+        self.reg, self.max_iter, self.cache_size = reg, max_iter, cache_size
+        self.cache   = OrderedDict()   # recipient key → (donor ids, α, β)
+        self.last    = None
+        self.history = []
+
+    def __call__(self, donor_income, donor_tokens, recip_income,
+                 donor_ids=None, recip_ids=None) -> np.ndarray:
+        import ot                                     # POT pulls in scipy: load on first use
+        # ------------- early-exit on zero mass -------------
+        mass = donor_tokens.sum()
+        if mass < 1e-9 or len(recip_income) == 0:
+            return np.zeros_like(recip_income, dtype=float)
+
+        # ------------- rescale incomes to [0, 1] -----------
+        scale = max(donor_income.max(), recip_income.max())
+        d = donor_income / scale
+        r = recip_income / scale
+
+        a = donor_tokens / mass                       # probability on donors
+        b = np.ones(len(r)) / len(r)                 # equal weight recipients
+        M = ot.utils.dist(d[:, None], r[:, None], metric="euclidean")
+
+        key  = np.asarray(recip_income if recip_ids is None else recip_ids).tobytes()
+        warm = self._warmstart(key, donor_ids, len(d), scale)
+
+        # Use the *stabilised* Sinkhorn variant – less overflow prone
+        t0 = time.perf_counter()
+        γ, log = ot.bregman.sinkhorn_stabilized(a, b, M, reg=self.reg, numItermax=self.max_iter,
+                                                warmstart=warm, log=True)
+        wall = time.perf_counter() - t0
+
+        col = γ.sum(0)
+        self.last = SolveStats(int(log["n_iter"]),
+                               float(np.abs(γ.sum(1) - a).sum() + np.abs(col - b).sum()),
+                               wall, warm is not None)
+        self.history.append(self.last)
+        if self.cache_size:
+            ids = np.arange(len(d)) if donor_ids is None else np.asarray(donor_ids)
+            self.cache[key] = (ids, log["alpha"] * scale, log["beta"] * scale)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
 
-    # Use the *stabilised* Sinkhorn variant – less overflow prone
-    γ = ot.bregman.sinkhorn_stabilized(a, b, M, reg=5e-3, numItermax=5000)
+        return col * mass                            # back to € units
 
-    return γ.sum(0) * mass                       # back to € units
+    def _warmstart(self, key, donor_ids, n_donors, scale):
+        if key not in self.cache:
+            return None
+        self.cache.move_to_end(key)
+        ids, alpha, beta = self.cache[key]
+        donor_ids = np.arange(n_donors) if donor_ids is None else np.asarray(donor_ids)
+        # carry α over for donors seen last time, start new donors at 0
+        order = np.argsort(ids, kind="stable")
+        ids, alpha = ids[order], alpha[order]
+        pos   = np.minimum(np.searchsorted(ids, donor_ids), len(ids) - 1)
+        seen  = ids[pos] == donor_ids
+        return np.where(seen, alpha[pos], 0.0) / scale, beta / scale
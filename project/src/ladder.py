@@ -1,18 +1,137 @@
 import numpy as np
-from sklearn.isotonic import IsotonicRegression
+
+def isotonic(y: np.ndarray) -> np.ndarray:
+    """
+    Least-squares non-decreasing fit (pool-adjacent-violators, O(K)):
+    merge neighbouring blocks while a block's mean exceeds its successor's.
+    """
+    sums, counts = [], []
+    for v in np.asarray(y, float):
+        s, c = v, 1
+        while sums and sums[-1] * c > s * counts[-1]:   # mean(prev) > mean(cur)
+            s, c = s + sums.pop(), c + counts.pop()
+        sums.append(s); counts.append(c)
+    return np.repeat(np.divide(sums, counts), counts)
+
+def isotonic_batch(Y: np.ndarray) -> np.ndarray:
+    """
+    `isotonic` of every row of an (S, K) array at once, by the min–max
+    formula ŷᵢ = max_{j≤i} min_{k≥i} mean(y[j..k]) – O(S·K²), for small K.
+    """
+    Y = np.asarray(Y, float)
+    K = Y.shape[-1]
+    C = np.concatenate([np.zeros(Y.shape[:-1] + (1,)), np.cumsum(Y, axis=-1)], axis=-1)
+    j, k = np.arange(K)[:, None], np.arange(K)[None, :]
+    upper = k >= j
+    A = (C[..., None, 1:] - C[..., :-1, None]) / np.where(upper, k - j + 1, 1)  # A[j, k]
+    A = np.where(upper, A, np.inf)
+    M = np.minimum.accumulate(A[..., ::-1], axis=-1)[..., ::-1]   # M[j, i] = min_{k≥i} A[j, k]
+    return np.where(upper, M, -np.inf).max(axis=-2)
 
 def project_sorted_positive(p: np.ndarray) -> np.ndarray:
-    """Isotonic projection onto 0 < p₁ < … < pₖ (O(K))."""
-    iso = IsotonicRegression(increasing=True)
-    p_sorted = iso.fit_transform(range(len(p)), p)
+    """Isotonic projection onto 0 < p₁ < … < pₖ (O(K)); (S, K) input projects each row."""
+    p_sorted = isotonic(p) if np.ndim(p) == 1 else isotonic_batch(p)
     # tiny ε to enforce strict monotonicity
-    return np.maximum(p_sorted + 1e-6 * np.arange(1, len(p)+1), 1e-3)
+    return np.maximum(p_sorted + 1e-6 * np.arange(1, np.shape(p)[-1]+1), 1e-3)
 
 def gini(eff: np.ndarray) -> float:
+    """
+    Σ|xᵢ-xⱼ| / (2n²·mean), exactly, via the sorted form
+    Σ(2i-n-1)·x₍ᵢ₎ / (n·Σx) – O(n log n) time, O(n) memory.  An empty or
+    all-zero input gives 0.
+    """
     n = len(eff)
-    if n == 0:
+    x = np.sort(np.asarray(eff, float))
+    if n == 0 or x.sum() == 0:
+        return 0.0
+    return float(np.dot(2 * np.arange(1, n+1) - n - 1, x) / (n * x.sum()))
+
+def gini_batch(eff: np.ndarray) -> np.ndarray:
+    """
+    `gini` of every row of an (S, N) array; NaN entries are left out, so
+    rows may hold different numbers of values.  Empty or all-zero rows give 0.
+    """
+    x = np.sort(np.asarray(eff, float), axis=-1)  # NaNs sort last
+    n = (~np.isnan(x)).sum(axis=-1, keepdims=True)
+    rank = np.arange(1, x.shape[-1] + 1)
+    x = np.where(rank <= n, x, 0.0)
+    num = ((2 * rank - n - 1) * x).sum(axis=-1)
+    den = n[..., 0] * x.sum(axis=-1)
+    return np.divide(num, den, out=np.zeros(len(num)), where=den != 0)
+
+class GiniSketch:
+    """
+    Mergeable fixed-memory Gini summary for data streamed in chunks: per
+    bin of a fixed grid, the count, sum, min and max of the values seen.
+    Pairs in different bins contribute exactly (every value in a lower bin
+    is ≤ every value in a higher one); pairs inside a bin are estimated
+    from its spread, and `error()` bounds the total deviation from `gini`.
+    Values outside [lo, hi] land in the end bins – still bounded, just
+    looser.  When each bin holds one distinct value the result is exact.
+    """
+
+    def __init__(self, lo: float, hi: float, bins: int = 4096):
+        self.origin, self.width = float(lo), (float(hi) - float(lo)) / bins or 1.0
+        self.n  = np.zeros(bins)
+        self.s  = np.zeros(bins)
+        self.lo = np.full(bins, np.inf)
+        self.hi = np.full(bins, -np.inf)
+
+    def add(self, x) -> None:
+        x = np.asarray(x, float).ravel()
+        # monotone in x, so bin order is value order
+        b = np.clip(np.floor((x - self.origin) / self.width), 0, len(self.n) - 1).astype(np.intp)
+        self.n += np.bincount(b, minlength=len(self.n))
+        self.s += np.bincount(b, weights=x, minlength=len(self.n))
+        np.minimum.at(self.lo, b, x)
+        np.maximum.at(self.hi, b, x)
+
+    def merge(self, other: "GiniSketch") -> None:
+        self.n += other.n; self.s += other.s
+        np.minimum(self.lo, other.lo, out=self.lo)
+        np.maximum(self.hi, other.hi, out=self.hi)
+
+    def _within(self):
+        # Σ_{i<j}|xᵢ-xⱼ| inside each bin: bounds from its range r, and the
+        # uniform-spread estimate C(n,2)·r/3 clipped into them
+        n = self.n
+        r = np.where(n > 0, self.hi - self.lo, 0.0)
+        lower = np.maximum(n - 1, 0) * r
+        upper = np.floor(n * n / 4) * r
+        return lower, np.clip(n * (n - 1) / 2 * r / 3, lower, upper), upper
+
+    def value(self) -> float:
+        n, s = self.n, self.s
+        N, S = n.sum(), s.sum()
+        if N == 0 or S == 0:
+            return 0.0
+        cross = np.dot(s, np.cumsum(n) - n) - np.dot(n, np.cumsum(s) - s)
+        return float((cross + self._within()[1].sum()) / (N * S))
+
+    def error(self) -> float:
+        """Upper bound on |value() - gini(all values added)|."""
+        N, S = self.n.sum(), self.s.sum()
+        if N == 0 or S == 0:
+            return 0.0
+        lower, est, upper = self._within()
+        return float(np.maximum(est - lower, upper - est).sum() / (N * abs(S)))
+
+def weighted_gini(x: np.ndarray, w: np.ndarray) -> float:
+    """
+    Gini with frequency weights: equals `gini` of x with xᵢ repeated wᵢ times.
+    O(n log n) via cumulative weights and weighted sums over sorted x.
+    """
+    if len(x) == 0:
+        return 0.0
+    order = np.argsort(x, kind="stable")
+    x, w  = np.asarray(x, float)[order], np.asarray(w, float)[order]
+    wx    = w * x
+    if wx.sum() == 0:
         return 0.0
-    return np.abs(eff[:, None] - eff[None, :]).sum() / (2 * n**2 * eff.mean())
+    W_lt  = np.cumsum(w) - w                      # weight strictly before i
+    S_lt  = np.cumsum(wx) - wx                    # weighted sum strictly before i
+    pair  = np.dot(wx, W_lt) - np.dot(w, S_lt)    # Σ_{i<j} wᵢwⱼ(xⱼ-xᵢ)
+    return float(pair / (w.sum() * wx.sum()))
 
 def update_prices(p: np.ndarray,
                   sales: np.ndarray,
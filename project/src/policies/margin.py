@@ -1,50 +1,67 @@
 import numpy as np
-from ..auction.premium import shapley_reserve
-from ..config import cfg, rng
+from ..auction.premium import shapley_reserves
+from ..config import cfg
+from .. import streams
 
-def act(obs, shade_factor=0.7, randomize=True, seed=42):
+def act(obs, shade_factor=0.7, randomize=True, seed=42, agent=0, epoch=0, cfg=cfg):
     """
     Margin-seeking policy: strategically shades bids to maximize consumer surplus.
-    
+
     Args:
         obs: Observation vector [prices, income, credit]
         shade_factor: Base shading multiplier (0.7 means bid 70% of surplus)
         randomize: Whether to apply random noise to the shading
         seed: Random seed for reproducibility
-        
+        agent: Agent index – selects this agent's noise stream
+        epoch: Current epoch – advances the noise stream
+
     Returns:
         (tier_id, bid) tuple
     """
-    prices, inc, cred = obs[:-2], obs[-2], obs[-1]
-    
-    # Use a separate RNG for reproducibility
-    local_rng = np.random.RandomState(seed)
-    
-    # Find affordable tiers (same logic as truthful)
-    affordable_tiers = []
-    for k in range(len(prices)-1, -1, -1):  # scan top→bottom
-        reserve = shapley_reserve(prices, k, cfg.lambda_)
-        if inc >= prices[k] + reserve - cred:
-            surplus = inc - prices[k]  # true surplus
-            
-            # Apply shading: multiply surplus by a factor < 1
-            if randomize:
-                # Log-normal gives heavy-tailed multiplier centered below 1.0
-                # μ=-0.5, σ=0.4 gives mode around shade_factor with positive skew
-                noise = local_rng.lognormal(mean=-0.5, sigma=0.4)
-                bid = surplus * shade_factor * noise
-            else:
-                bid = surplus * shade_factor
-                
-            # Ensure we don't bid below reserve
-            reserve_floor = max(reserve, cfg.lambda_ * (prices[k] - (0 if k == 0 else prices[k-1])))
-            bid = max(bid, reserve_floor + 0.01)  # tiny buffer to ensure it's > reserve
-            
-            affordable_tiers.append((k, bid, surplus - bid))  # (tier, bid, expected_margin)
-    
-    if not affordable_tiers:
-        return len(prices), 0.0  # walk away
-        
-    # Choose tier with maximum expected margin
-    best_tier, best_bid, _ = max(affordable_tiers, key=lambda x: x[2])
-    return best_tier, float(best_bid)  # ensure we return Python float, not numpy float 
\ No newline at end of file
+    tiers, bids = act_batch(np.asarray(obs, float)[None, :], shade_factor, randomize,
+                            seed, epoch, agent_idx=np.array([agent]), cfg=cfg)
+    return int(tiers[0]), float(bids[0])  # ensure we return Python scalars, not numpy
+
+def act_batch(obs, shade_factor=0.7, randomize=True, seed=42, epoch=0,
+              agent_idx=None, cfg=cfg):
+    """
+    Vectorised margin-seeking policy over an (N, K+2) observation matrix.
+
+    Noise for agent i on tier k at epoch t is lane k % 4 of the
+    counter-based block (i, t, k // 4) under `seed`, so each agent draws
+    independently and results do not depend on population size or
+    evaluation order.
+
+    Returns:
+        (tiers, bids) arrays; tier K means walk away
+    """
+    prices, inc, cred = obs[:, :-2], obs[:, -2], obs[:, -1]
+    N, K = prices.shape
+    if agent_idx is None:
+        agent_idx = np.arange(N)
+
+    # affordable tiers (same rule as truthful)
+    reserve = shapley_reserves(prices, cfg.lambda_)
+    ok      = inc[:, None] >= prices + reserve - cred[:, None]
+    surplus = inc[:, None] - prices                 # true surplus
+
+    # Apply shading: multiply surplus by a factor < 1
+    bid = surplus * shade_factor
+    if randomize:
+        # Log-normal gives heavy-tailed multiplier centered below 1.0
+        # μ=-0.5, σ=0.4 gives mode around shade_factor with positive skew
+        z = streams.standard_normal4(seed, np.asarray(agent_idx)[:, None], epoch,
+                                     np.arange(-(-K // 4))[None, :])
+        bid = bid * np.exp(-0.5 + 0.4 * z.reshape(N, -1)[:, :K])
+
+    # Ensure we don't bid below reserve (tiny buffer to ensure it's > reserve)
+    bid = np.maximum(bid, reserve + 0.01)
+
+    # Choose tier with maximum expected margin; ties go to the higher tier
+    margin = np.where(ok, surplus - bid, -np.inf)
+    tiers  = K - 1 - margin[:, ::-1].argmax(axis=1)
+    walk   = ~ok.any(axis=1)
+    tiers[walk] = K
+    bids = bid[np.arange(N), np.minimum(tiers, K-1)]
+    bids[walk] = 0.0
+    return tiers, bids
@@ -1,4 +1,5 @@
-from ..auction.premium import shapley_reserve
+import numpy as np
+from ..auction.premium import shapley_reserve, shapley_reserves
 from ..config import cfg
 
 def act(obs, cfg=cfg):
@@ -8,3 +9,17 @@ def act(obs, cfg=cfg):
         if inc >= prices[k] + reserve - cred:
             return k, inc - prices[k]               # truthful surplus bid
     return len(prices), 0.0                         # walk away
+
+def act_batch(obs: np.ndarray, cfg=cfg):
+    """
+    Vectorised `act` over an (N, K+2) observation matrix.
+    Returns (tiers, bids) arrays; tier K means walk away.
+    """
+    prices, inc, cred = obs[:, :-2], obs[:, -2], obs[:, -1]
+    K = prices.shape[1]
+    ok = inc[:, None] >= prices + shapley_reserves(prices, cfg.lambda_) - cred[:, None]
+    tiers = K - 1 - ok[:, ::-1].argmax(axis=1)      # highest affordable tier
+    tiers[~ok.any(axis=1)] = K
+    rows = np.arange(len(obs))
+    bids = np.where(tiers < K, inc - prices[rows, np.minimum(tiers, K-1)], 0.0)
+    return tiers, bids
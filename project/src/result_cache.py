@@ -0,0 +1,125 @@
+"""
+Content-addressed on-disk cache of simulation KPI frames.
+
+A run's key is the SHA-256 of everything that determines its output: the
+fully resolved Config (defaults plus overrides), initial prices, policy
+parameters, population parameters, seed, epoch count and a hash of the
+`src/` sources.  Frames are stored as Parquet files named by key; reads
+refresh a file's mtime and writes evict least-recently-used files until
+the directory fits in `max_bytes`.
+
+Location: $STASSEL_CACHE_DIR, else ~/.cache/s-tassel/results.
+"""
+import hashlib, inspect, json, os, pathlib, tempfile
+from dataclasses import asdict, replace
+import pyarrow as pa, pyarrow.parquet as pq
+from .config import Config
+from .simulate import iter_epochs, simulate
+
+SRC = pathlib.Path(__file__).parent
+DEFAULT_DIR = pathlib.Path(os.environ.get("STASSEL_CACHE_DIR",
+                                          pathlib.Path.home() / ".cache" / "s-tassel" / "results"))
+DEFAULT_MAX_BYTES = 512 * 2**20
+
+_code_version = None
+
+def code_version() -> str:
+    """Hash of every .py file under src/ – changes whenever the model code does."""
+    global _code_version
+    if _code_version is None:
+        h = hashlib.sha256()
+        for f in sorted(SRC.rglob("*.py")):
+            h.update(str(f.relative_to(SRC)).encode())
+            h.update(f.read_bytes())
+        _code_version = h.hexdigest()[:16]
+    return _code_version
+
+def run_params(*args, **kwargs):
+    """
+    Resolve `simulate` arguments to the canonical dict that determines its
+    output, or None when the run depends on outside state (an external
+    ledger, a checkpoint), on wall-clock timings (profile=True) or has to
+    run for its side effects (a trace writer, checkpoint files).
+    """
+    bound = inspect.signature(iter_epochs).bind(*args, **kwargs)
+    bound.apply_defaults()
+    a = dict(bound.arguments)
+    overrides = a.pop("overrides")
+    a.pop("population_dir")                          # scratch location only
+    if (a.pop("ledger") is not None or a.pop("resume") is not None
+            or a.pop("checkpoint") is not None or a.pop("trace") is not None or a["profile"]):
+        return None
+    a["cfg"]    = asdict(replace(a["cfg"] or Config(), **overrides))
+    a["prices"] = [float(p) for p in a["prices"]]
+    a["code"]   = code_version()
+    return a
+
+def run_key(params: dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+class ResultCache:
+    def __init__(self, root=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = pathlib.Path(root) if root is not None else DEFAULT_DIR
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.root / f"{key}.parquet"
+
+    def get_table(self, key: str):
+        """Cached run for `key` as an Arrow table, or None."""
+        path = self._path(key)
+        try:
+            table = pq.read_table(path)
+            os.utime(path)                               # mark as recently used
+        except (OSError, pa.ArrowInvalid):               # missing, or evicted since the read
+            return None
+        return table
+
+    def get(self, key: str):
+        """Cached KPI DataFrame for `key`, or None."""
+        table = self.get_table(key)
+        return table.to_pandas() if table is not None else None
+
+    def put(self, key: str, frame) -> None:
+        """Store a KPI DataFrame (or Arrow table) under `key`."""
+        table = frame if isinstance(frame, pa.Table) else pa.Table.from_pandas(frame, preserve_index=False)
+        # write-then-rename so concurrent readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp)
+            os.replace(tmp, self._path(key))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop least-recently-used entries until the cache fits `max_bytes`."""
+        files = []
+        for f in self.root.glob("*.parquet"):
+            try:
+                st = f.stat()
+            except FileNotFoundError:                    # evicted by another process
+                continue
+            files.append((st.st_mtime, st.st_size, f))
+        total = sum(size for _, size, _ in files)
+        for _, size, f in sorted(files, key=lambda t: t[0]):
+            if total <= self.max_bytes:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
+
+def cached_simulate(*args, cache: ResultCache = None, **kwargs):
+    """`simulate` behind the on-disk cache; uncacheable runs just simulate."""
+    params = run_params(*args, **kwargs)
+    if params is None:
+        return simulate(*args, **kwargs)
+    cache = cache or ResultCache()
+    key = run_key(params)
+    df = cache.get(key)
+    if df is None:
+        df = simulate(*args, **kwargs)
+        cache.put(key, df)
+    return df
@@ -0,0 +1,221 @@
+"""
+Local bid-ingestion service in front of a `MarketplaceEnv`.
+
+External agents connect over TCP (127.0.0.1 by default) and exchange
+newline-delimited JSON messages:
+
+    → {"op": "subscribe", "agents": ["b0", "b1", ...]}
+    ← {"op": "obs", "epoch": e, "prices": [...], "agents": [...],
+       "income": [...], "credit": [...]}          now and at every epoch start
+    → {"op": "bid", "id": 7, "epoch": e, "bids": [["b0", tier, bid], ...]}
+    ← {"op": "ack", "id": 7, "epoch": e, "accepted": n, "rejected": [["b1", why], ...]}
+    ← {"op": "closed", "epoch": e, "revenue": ..., "prices": [...], ...}   the env's EpochMetrics
+    → {"op": "metrics"}
+    ← {"op": "metrics", ...}                      see `BidServer.metrics`
+
+Bids are validated on arrival and queued; a micro-batcher hands them to
+`env.submit` as one array chunk once `batch_size` bids are pending or
+`batch_interval` seconds have passed, and only then acks them.  At each
+epoch deadline the queue is flushed and `env.close_epoch()` runs the
+nightly closure.  A bid tagged with another epoch is rejected (stale or
+future); each agent gets one bid per epoch, on a tier 0..K-1 that still
+has stock (walking away means not bidding).
+"""
+import asyncio, collections, json, time
+from dataclasses import asdict
+import numpy as np
+
+LINE_LIMIT = 1 << 24          # bytes per JSON line (bid and obs messages can be large)
+
+class BidServer:
+    def __init__(self, env, host: str = "127.0.0.1", port: int = 0,
+                 epoch_seconds: float = 1.0, batch_size: int = 4096,
+                 batch_interval: float = 0.005, epochs: int = None):
+        self.env  = env
+        self.host, self.port = host, port
+        self.epoch_seconds  = epoch_seconds
+        self.batch_size     = batch_size
+        self.batch_interval = batch_interval
+        self.epochs = epochs                       # None: run until closed
+        self._seen  = np.zeros(len(env.agents), bool)   # agents that bid this epoch
+        self._clients = {}                         # writer → connection task
+        self._subs  = {}                           # writer → subscribed agent indices
+        self._pending, self._n_pending = [], 0     # (writer, id, t_recv, idx, tiers, bids, rejected)
+        self._server = self._clock = self._batch = None
+        # ---------- metrics ----------
+        self.t_start = None
+        self.bids_received = self.bids_accepted = self.bids_rejected = 0
+        self.batches = 0
+        self.latency = collections.deque(maxlen=100_000)   # receive → submitted, per message
+        self.closure_s = 0.0
+
+    # ---------- lifecycle ----------
+    async def start(self):
+        self._server = await asyncio.start_server(self._client, self.host, self.port,
+                                                  limit=LINE_LIMIT)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.t_start = time.perf_counter()
+        self._open_epoch()
+        self._batch = asyncio.create_task(self._batcher())
+        self._clock = asyncio.create_task(self._epoch_clock())
+        return self
+
+    async def run(self):
+        """Serve until `epochs` epochs have closed (or forever)."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._clock
+        finally:
+            await self.close()
+
+    async def close(self):
+        for t in (self._batch, self._clock):
+            t.cancel()
+        self._server.close()
+        for w in list(self._clients):
+            w.close()
+        await asyncio.gather(*self._clients.values(), return_exceptions=True)
+        await self._server.wait_closed()
+
+    # ---------- epochs ----------
+    def _open_epoch(self):
+        self.env.reset()
+        self._seen[:] = False
+
+    async def _epoch_clock(self):
+        while True:
+            await self._push_obs(self._subs)
+            await asyncio.sleep(self.epoch_seconds)
+            self._flush()
+            env = self.env
+            t0 = time.perf_counter()
+            env.close_epoch()
+            self.closure_s = time.perf_counter() - t0
+            self._broadcast({"op": "closed", **asdict(env.metrics)})
+            if self.epochs is not None and env.epoch >= self.epochs:
+                return
+            self._open_epoch()
+
+    async def _push_obs(self, subs):
+        env = self.env
+        B, prices = env.buyers, env.prices.tolist()
+        for w, idx in list(subs.items()):
+            self._send(w, {"op": "obs", "epoch": env.epoch, "prices": prices,
+                           "agents": [env.agents[i] for i in idx],
+                           "income": B.income[idx].tolist(), "credit": B.credit[idx].tolist()})
+        await asyncio.gather(*(w.drain() for w in list(subs)), return_exceptions=True)
+
+    # ---------- ingestion ----------
+    async def _client(self, reader, writer):
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while line := await reader.readline():
+                t_recv = time.perf_counter()
+                try:
+                    await self._dispatch(writer, json.loads(line), t_recv)
+                except (ValueError, KeyError, TypeError) as e:
+                    self._send(writer, {"op": "error", "error": f"malformed message: {e!r}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            self._subs.pop(writer, None)
+            writer.close()
+
+    async def _dispatch(self, writer, msg, t_recv):
+        op = msg["op"]
+        if op == "bid":
+            self._ingest(writer, msg, t_recv)
+        elif op == "subscribe":
+            index = self.env.buyers.index
+            self._subs[writer] = np.array([index[a] for a in msg["agents"] if a in index], int)
+            await self._push_obs({writer: self._subs[writer]})
+        elif op == "metrics":
+            self._send(writer, {"op": "metrics", **self.metrics()})
+        else:
+            self._send(writer, {"op": "error", "error": f"unknown op {op!r}"})
+
+    def _ingest(self, writer, msg, t_recv):
+        env, K = self.env, len(self.env.prices)
+        rows = [tuple(r) for r in msg.get("bids", ())]
+        if any(len(r) != 3 for r in rows):
+            raise ValueError("each bid is [agent, tier, bid]")
+        self.bids_received += len(rows)
+        epoch = msg.get("epoch", env.epoch)
+        if epoch != env.epoch:
+            why = "stale epoch" if epoch < env.epoch else "future epoch"
+            self._reject(writer, msg.get("id"), [[r[0], why] for r in rows])
+            return
+        idx, tiers, bids, rejected = [], [], [], []
+        for agent, tier, bid in rows:
+            i = env.buyers.index.get(agent)
+            if i is None:
+                rejected.append([agent, "unknown agent"])
+            elif self._seen[i]:
+                rejected.append([agent, "already bid this epoch"])
+            elif not (type(tier) is int and 0 <= tier < K
+                      and type(bid) in (int, float) and np.isfinite(bid)):
+                rejected.append([agent, "invalid tier or bid"])
+            elif env.stock[tier] <= 0:
+                rejected.append([agent, "tier sold out"])
+            else:
+                self._seen[i] = True
+                idx.append(i); tiers.append(tier); bids.append(bid)
+        self.bids_rejected += len(rejected)
+        self._pending.append((writer, msg.get("id"), t_recv, idx, tiers, bids, rejected))
+        self._n_pending += len(idx)
+        if self._n_pending >= self.batch_size:
+            self._flush()
+
+    def _reject(self, writer, mid, rejected):
+        self.bids_rejected += len(rejected)
+        self._send(writer, {"op": "ack", "id": mid, "epoch": self.env.epoch,
+                            "accepted": 0, "rejected": rejected})
+
+    async def _batcher(self):
+        while True:                                # full batches flush inline in `_ingest`
+            await asyncio.sleep(self.batch_interval)
+            self._flush()
+
+    def _flush(self):
+        """Hand every pending bid to the env as one chunk and ack its messages."""
+        if not self._pending:
+            return
+        pending, self._pending, self._n_pending = self._pending, [], 0
+        idx   = np.fromiter((i for p in pending for i in p[3]), int)
+        tiers = np.fromiter((k for p in pending for k in p[4]), int)
+        bids  = np.fromiter((b for p in pending for b in p[5]), float)
+        self.bids_accepted += self.env.submit(idx, tiers, bids)
+        self.batches += 1
+        t = time.perf_counter()
+        epoch = self.env.epoch
+        for writer, mid, t_recv, i, _, _, rejected in pending:
+            self.latency.append(t - t_recv)
+            self._send(writer, {"op": "ack", "id": mid, "epoch": epoch,
+                                "accepted": len(i), "rejected": rejected})
+
+    # ---------- output ----------
+    def _send(self, writer, msg):
+        if not writer.is_closing():
+            writer.write(json.dumps(msg).encode() + b"\n")
+
+    def _broadcast(self, msg):
+        for w in list(self._subs):
+            self._send(w, msg)
+
+    def metrics(self) -> dict:
+        """
+        Ingestion counters since start, bids/s accepted, and receive →
+        submitted latency percentiles (ms) over the last 100k messages.
+        """
+        elapsed = time.perf_counter() - self.t_start if self.t_start else 0.0
+        lat = np.array(self.latency) * 1e3
+        p50, p99, pmax = np.percentile(lat, [50, 99, 100]).tolist() if lat.size else (0.0,) * 3
+        return {"epoch": self.env.epoch, "elapsed_s": elapsed,
+                "bids_received": self.bids_received, "bids_accepted": self.bids_accepted,
+                "bids_rejected": self.bids_rejected, "batches": self.batches,
+                "mean_batch": self.bids_accepted / self.batches if self.batches else 0.0,
+                "bids_per_s": self.bids_accepted / elapsed if elapsed else 0.0,
+                "latency_p50_ms": p50, "latency_p99_ms": p99, "latency_max_ms": pmax,
+                "closure_ms": self.closure_s * 1e3, "clients": len(self._clients)}
@@ -0,0 +1,162 @@
+"""
+One self-contained simulation run.
+
+Everything a run touches – Config, RNG, ledger, env – is built inside
+`simulate`, so runs can execute side by side (threads, processes) without
+sharing the module-level `config.cfg` / `config.rng` singletons.
+"""
+import tempfile
+from dataclasses import replace
+from typing import TYPE_CHECKING
+import numpy as np
+from .config import Config
+from .env.buyers import BuyerStore
+from .env.market_env import MarketplaceEnv
+from .env.checkpoint import load_checkpoint, load_stream, save_checkpoint
+from .env.population import PopulationEnv, create_population
+from .env.profiling import ClosureProfile
+from .policies import truthful, margin
+from .tokens.ledger import MemoryLedger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+POLICIES = ("truthful", "margin")
+
+def make_policy(policy: str, cfg: Config, shade_factor=0.7, randomize=True, seed=42,
+                agent_idx=None):
+    """
+    Return act(obs_matrix, epoch) -> (tiers, bids) for the named policy.
+    `seed` may be an array with one entry per row (e.g. per scenario).
+    """
+    if policy == "truthful":
+        return lambda obs, epoch: truthful.act_batch(obs, cfg=cfg)
+    if policy == "margin":
+        return lambda obs, epoch: margin.act_batch(obs, shade_factor, randomize,
+                                                   seed, epoch, agent_idx, cfg=cfg)
+    raise ValueError(f"unknown policy {policy!r}; expected one of {POLICIES}")
+
+def iter_epochs(epochs: int = 30,
+                n_buyers: int = 800,
+                prices=(10, 15, 20, 25),
+                policy: str = "truthful",
+                shade_factor: float = 0.7,
+                randomize: bool = True,
+                income_mu: float = 3.0,
+                income_sigma: float = 1.0,
+                seed: int = 42,
+                cfg: Config = None,
+                ledger=None,
+                resume=None,
+                checkpoint=None,
+                profile: bool = False,
+                trace=None,
+                chunk_size: int = None,
+                population_dir=None,
+                **overrides):
+    """
+    Run one market for `epochs` epochs, yielding one KPI dict per epoch as
+    soon as its closure is done (the env's `EpochMetrics.record()`).  Stop
+    early by closing the generator (or breaking out of the loop).
+
+    `cfg` defaults to a fresh `Config()`; keyword `overrides` (e.g.
+    lambda_=0.3, beta=200) are applied on a copy, never on the caller's
+    object.  Incomes and margin noise are drawn from `seed`.
+
+    `resume` continues from a checkpoint file instead (population, ladder
+    and saved Config come from it; `overrides` still apply), running
+    `epochs` further epochs.  A saved policy seed and noise counter
+    replace `seed`, so the margin noise carries on where it stopped.
+    `checkpoint` is a path rewritten after every epoch, ready to resume
+    an interrupted run from.
+
+    `profile=True` adds per-phase closure timings (t_*) and counters.
+
+    `trace` (a `columnar.ColumnWriter`) receives one row per agent and
+    epoch: chosen tier (-1 = walked away), bid, and the credit and
+    effective price the agent bid against.
+
+    `chunk_size` switches to the out-of-core `PopulationEnv`: income and
+    credit are memory-mapped files under `population_dir` (a temporary
+    directory by default) and every pass streams `chunk_size` buyers at a
+    time.  Its Gini comes from a sketch; `gini_error` bounds the error.
+    """
+    if chunk_size is not None:
+        if resume is not None or checkpoint is not None or profile:
+            raise ValueError("chunk_size does not support resume, checkpoint or profile")
+        cfg = replace(cfg or Config(), **overrides)
+        with tempfile.TemporaryDirectory() as tmp:
+            income, credit = create_population(population_dir or tmp, n_buyers, income_mu,
+                                               income_sigma, seed, chunk_size)
+            env = PopulationEnv(income, credit, prices, chunk_size, ledger, cfg)
+            yield from _population_epochs(env, epochs, policy, shade_factor, randomize, seed, trace)
+        return
+
+    if resume is not None:
+        env, _ = load_checkpoint(resume, ledger=ledger, **overrides)
+        env.profile = ClosureProfile() if profile else None
+        cfg = env.cfg
+        saved_seed, counter = load_stream(resume)
+        seed = seed if saved_seed is None else saved_seed
+    else:
+        cfg = replace(cfg or Config(), **overrides)
+        rng = np.random.default_rng(seed)
+        income = rng.lognormal(income_mu, income_sigma, n_buyers)
+        buyers = BuyerStore([f"b{i}" for i in range(n_buyers)], income)
+        env = MarketplaceEnv(buyers, prices, cfg=cfg, profile=profile,
+                             ledger=ledger if ledger is not None else MemoryLedger(cfg.token_expiry))
+        counter = env.epoch
+    act = make_policy(policy, cfg, shade_factor, randomize, seed)
+
+    for _ in range(epochs):
+        epoch = env.epoch
+        env.reset()
+        obs = env.observations()
+        bid_tiers, bids = act(obs, counter)
+        if trace is not None:
+            write_trace(trace, epoch, obs, bid_tiers, bids)
+        env.step_batch(bid_tiers, bids)
+        counter += 1
+        if checkpoint is not None:
+            save_checkpoint(env, checkpoint, seed=seed, counter=counter)
+        rec = env.metrics.record()
+        if env.profile:
+            rec.update(env.profile.record())
+        yield rec
+
+def _population_epochs(env, epochs, policy, shade_factor, randomize, seed, trace):
+    cfg = env.cfg
+    for _ in range(epochs):
+        epoch = env.epoch
+        env.reset()
+        for sl in env.chunks():
+            act = make_policy(policy, cfg, shade_factor, randomize, seed,
+                              agent_idx=np.arange(sl.start, sl.stop))
+            obs = env.observations(sl)
+            bid_tiers, bids = act(obs, env.epoch)
+            if trace is not None:
+                write_trace(trace, epoch, obs, bid_tiers, bids, agent0=sl.start)
+            env.submit(sl, bid_tiers, bids)
+        env.close_epoch()
+        rec = env.metrics.record()
+        rec["gini_error"] = env.gini_error
+        yield rec
+
+def write_trace(trace, epoch: int, obs: np.ndarray, tiers, bids, agent0: int = 0) -> None:
+    """One epoch of per-agent rows, taken from the observations the policy saw."""
+    K = obs.shape[1] - 2
+    bid_on = tiers < K
+    rows = np.arange(len(obs))
+    trace.write_columns(
+        epoch=np.full(len(obs), epoch, np.int32),
+        agent=(rows + agent0).astype(np.int32),
+        tier=np.where(bid_on, tiers, -1).astype(np.int8),
+        bid=np.asarray(bids, float),
+        credit=obs[:, -1].copy(),
+        eff_price=np.where(bid_on, np.maximum(obs[rows, np.minimum(tiers, K - 1)] - obs[:, -1], 0.0),
+                           np.nan))
+
+def simulate(*args, **kwargs) -> "pd.DataFrame":
+    """Run `iter_epochs` (same arguments) to completion; one KPI row per epoch."""
+    import pandas as pd                               # ~0.3 s import; only needed here
+    return pd.DataFrame(list(iter_epochs(*args, **kwargs)))
@@ -0,0 +1,86 @@
+"""
+Parameter sweeps over `simulate.simulate`, fanned out on a process pool.
+Each grid point runs in its own worker call with its own Config, RNG and
+in-memory ledger; results come back as one tidy DataFrame.
+
+`run_ensemble` gives the same frame for sweeps over seeds and per-scenario
+Config fields by advancing every point together in one EnsembleEnv.
+"""
+import itertools, os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+import numpy as np, pandas as pd
+from .config import Config
+from .env.ensemble import EnsembleEnv, SCENARIO_FIELDS
+from .simulate import make_policy, simulate
+
+def grid(**axes) -> list:
+    """Cartesian product of axis values → list of parameter dicts."""
+    keys = list(axes)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*axes.values())]
+
+def _run_point(job):
+    i, point, common = job
+    df = simulate(**common, **point)
+    for col, val in reversed(list(point.items())):
+        df.insert(0, col, val)
+    df.insert(0, "point", i)
+    return df
+
+def run_sweep(points, workers: int = None, **common) -> pd.DataFrame:
+    """
+    Simulate every parameter dict in `points` (keys are `simulate`
+    arguments or Config fields) and stack the per-epoch KPIs, one row per
+    (point, epoch).  `common` is passed to every run; workers=1 runs inline.
+    """
+    jobs = [(i, p, common) for i, p in enumerate(points)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        frames = [_run_point(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            frames = list(ex.map(_run_point, jobs,
+                                 chunksize=max(1, len(jobs) // (4 * workers))))
+    return pd.concat(frames, ignore_index=True)
+
+def run_ensemble(points, epochs: int = 30, n_buyers: int = 800, prices=(10, 15, 20, 25),
+                 policy: str = "truthful", shade_factor: float = 0.7, randomize: bool = True,
+                 income_mu: float = 3.0, income_sigma: float = 1.0, seed: int = 42,
+                 cfg: Config = None, **overrides) -> pd.DataFrame:
+    """
+    `run_sweep` for points that differ only in `seed` and SCENARIO_FIELDS:
+    all S points run in lockstep in one EnsembleEnv, in this process.
+    Returns the same tidy frame (up to floating-point rounding).
+    """
+    extra = {k for p in points for k in p} - {"seed", *SCENARIO_FIELDS}
+    if extra:
+        raise ValueError(f"ensemble points can only vary seed and {SCENARIO_FIELDS}, got {sorted(extra)}")
+    base  = replace(cfg or Config(), **overrides)
+    seeds = np.array([p.get("seed", seed) for p in points], np.int64)
+    cfgs  = [replace(base, **{k: v for k, v in p.items() if k != "seed"}) for p in points]
+    income = np.stack([np.random.default_rng(s).lognormal(income_mu, income_sigma, n_buyers)
+                       for s in seeds])
+    env = EnsembleEnv(income, prices, cfgs)
+    S, N = env.S, env.N
+    act = make_policy(policy, env.row_cfg, shade_factor, randomize,
+                      np.repeat(seeds, N)[:, None], np.tile(np.arange(N), S))
+
+    snaps = []
+    for _ in range(epochs):
+        env.reset()
+        env.step_batch(*act(env.observations(), env.epoch))
+        snaps.append(env.metrics)
+
+    # (epoch, point) stacks → point-major rows, as run_sweep concatenates them
+    stack = lambda name: np.stack([getattr(m, name) for m in snaps], axis=1)   # (S, epochs, ...)
+    cols = {"point": np.repeat(np.arange(S), epochs)}
+    for key in dict.fromkeys(k for p in points for k in p):
+        cols[key] = np.repeat([p.get(key, np.nan) for p in points], epochs)
+    cols["epoch"] = np.tile([m.epoch for m in snaps], S)
+    for name in ("revenue", "gini", "token_balance", "minted", "expired",
+                 "credits_issued", "sell_through"):
+        cols[name] = stack(name).ravel()
+    for prefix, name in (("sold", "sales"), ("p", "prices")):
+        per_tier = stack(name)
+        cols.update({f"{prefix}{k}": per_tier[..., k].ravel() for k in range(per_tier.shape[-1])})
+    return pd.DataFrame(cols)
@@ -1,24 +1,185 @@
-import sqlite3, pathlib
+import abc, sqlite3, pathlib, uuid
+import numpy as np
 
 DB = pathlib.Path(__file__).parent / "tokens.db"
-with sqlite3.connect(DB) as con:
-    con.execute("""CREATE TABLE IF NOT EXISTS vault
-                   (epoch INT, donor TEXT, tokens REAL)""")
-
-def mint(epoch: int, donor: str, tokens: float) -> None:
-    with sqlite3.connect(DB) as con, con:
-        con.execute("INSERT INTO vault VALUES (?,?,?)",
-                    (epoch, donor, tokens))
-
-def load(epoch: int, expiry: int):
-    with sqlite3.connect(DB) as con:
-        return con.execute("SELECT donor,tokens FROM vault WHERE epoch>=?",
-                           (epoch - expiry,)).fetchall()
-
-def expire(epoch: int, expiry: int) -> float:
-    """Delete expired tokens and return how many tokens were removed."""
-    with sqlite3.connect(DB) as con, con:
-        cur = con.execute("SELECT SUM(tokens) FROM vault WHERE epoch<?", (epoch - expiry,))
-        expired_sum = cur.fetchone()[0] or 0.0
-        con.execute("DELETE FROM vault WHERE epoch<?", (epoch - expiry,))
+
+def _aggregate(donors, tokens):
+    """Sum tokens per donor → (unique donor indices, tokens) arrays."""
+    donors = np.asarray(donors, np.int64)
+    if donors.size == 0:
+        return np.empty(0, np.int64), np.empty(0)
+    uniq, inv = np.unique(donors, return_inverse=True)
+    return uniq, np.bincount(inv, weights=tokens, minlength=len(uniq))
+
+class Ledger(abc.ABC):
+    """
+    FairToken vault interface used by MarketplaceEnv.
+    Donors are integer agent indices; `load` returns one entry per donor.
+    """
+
+    def mint(self, epoch: int, donor: int, tokens: float) -> None:
+        self.mint_many(epoch, [donor], [tokens])
+
+    @abc.abstractmethod
+    def mint_many(self, epoch: int, donors, tokens) -> None:
+        """Add `tokens[i]` from donor `donors[i]` to the vault at `epoch`."""
+
+    @abc.abstractmethod
+    def load(self, epoch: int, expiry: int):
+        """Live tokens as (donor indices, tokens) arrays, aggregated per donor."""
+
+    @abc.abstractmethod
+    def expire(self, epoch: int, expiry: int) -> float:
+        """Drop tokens older than `epoch - expiry`; return the amount removed."""
+
+    @abc.abstractmethod
+    def balance(self, epoch: int, expiry: int) -> float:
+        """Total live tokens, i.e. the sum of `load`'s tokens."""
+
+    @abc.abstractmethod
+    def dump(self):
+        """Every stored row as (epochs, donors, tokens) arrays – for checkpoints."""
+
+    def load_rows(self, epochs, donors, tokens) -> None:
+        """Re-mint rows produced by `dump`, oldest epoch first."""
+        epochs = np.asarray(epochs, np.int64)
+        donors, tokens = np.asarray(donors, np.int64), np.asarray(tokens, float)
+        for e in np.unique(epochs):
+            sel = epochs == e
+            self.mint_many(int(e), donors[sel], tokens[sel])
+
+class MemoryLedger(Ledger):
+    """
+    In-process vault: a ring of `expiry + 1` epoch buckets.
+    Minting appends to the current bucket, expiry clears whole buckets.
+    """
+
+    def __init__(self, expiry: int):
+        n = expiry + 1
+        self.expiry  = expiry
+        self._epoch  = np.full(n, -1, np.int64)   # epoch held by each slot
+        self._total  = np.zeros(n)
+        self._donors = [[] for _ in range(n)]
+        self._tokens = [[] for _ in range(n)]
+        self._evicted = 0.0                        # reused slots, reported by next expire
+
+    def _clear(self, s: int) -> None:
+        self._epoch[s], self._total[s] = -1, 0.0
+        self._donors[s], self._tokens[s] = [], []
+
+    def mint_many(self, epoch, donors, tokens):
+        tokens = np.asarray(tokens, float)
+        if tokens.size == 0:
+            return
+        s = epoch % len(self._epoch)
+        if self._epoch[s] != epoch:
+            self._evicted += self._total[s]
+            self._clear(s)
+            self._epoch[s] = epoch
+        self._donors[s].append(np.asarray(donors, np.int64))
+        self._tokens[s].append(tokens)
+        self._total[s] += tokens.sum()
+
+    def _live(self, epoch, expiry):
+        if expiry > self.expiry:
+            raise ValueError(f"ring holds {self.expiry} epochs of history, asked for {expiry}")
+        return np.flatnonzero(self._epoch >= epoch - expiry)
+
+    def load(self, epoch, expiry):
+        live = self._live(epoch, expiry)
+        donors = [d for s in live for d in self._donors[s]]
+        if not donors:                             # nothing minted in the window
+            return _aggregate([], [])
+        return _aggregate(np.concatenate(donors),
+                          np.concatenate([t for s in live for t in self._tokens[s]]))
+
+    def balance(self, epoch, expiry):
+        return float(self._total[self._live(epoch, expiry)].sum())
+
+    def dump(self):
+        live = [s for s in np.argsort(self._epoch) if self._epoch[s] >= 0 and self._donors[s]]
+        if not live:
+            return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+        donors = [np.concatenate(self._donors[s]) for s in live]
+        return (np.repeat(self._epoch[live], [len(d) for d in donors]),
+                np.concatenate(donors),
+                np.concatenate([np.concatenate(self._tokens[s]) for s in live]))
+
+    def expire(self, epoch, expiry):
+        out, self._evicted = self._evicted, 0.0
+        for s in np.flatnonzero((self._epoch >= 0) & (self._epoch < epoch - expiry)):
+            out += self._total[s]
+            self._clear(s)
+        return out
+
+class SqliteLedger(Ledger):
+    """
+    Durable vault on SQLite.  One long-lived WAL connection per ledger; a
+    closure's mints go in one `executemany` transaction.  Rows carry a
+    `run_id`, so concurrent simulations can share one database file.
+    """
+
+    def __init__(self, path=DB, run_id: str = None):
+        self.path   = pathlib.Path(path)
+        self.run_id = run_id or uuid.uuid4().hex
+        self.con    = sqlite3.connect(self.path, timeout=30.0)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        with self.con:
+            self.con.execute("""CREATE TABLE IF NOT EXISTS vault
+                                (run_id TEXT, epoch INT, donor INT, tokens REAL)""")
+            cols = {r[1] for r in self.con.execute("PRAGMA table_info(vault)")}
+            if "run_id" not in cols:            # pre-namespace vault file
+                self.con.execute("ALTER TABLE vault ADD COLUMN run_id TEXT DEFAULT ''")
+            self.con.execute("""CREATE INDEX IF NOT EXISTS vault_run_epoch
+                                ON vault(run_id, epoch)""")
+
+    def mint_many(self, epoch, donors, tokens):
+        rows = [(self.run_id, int(epoch), int(d), float(t)) for d, t in zip(donors, tokens)]
+        if rows:
+            with self.con:
+                self.con.executemany("INSERT INTO vault(run_id,epoch,donor,tokens) "
+                                     "VALUES (?,?,?,?)", rows)
+
+    def load(self, epoch, expiry):
+        rows = self.con.execute("""SELECT CAST(donor AS INTEGER), SUM(tokens) FROM vault
+                                   WHERE run_id=? AND epoch>=?
+                                   GROUP BY 1 ORDER BY 1""",
+                                (self.run_id, epoch - expiry)).fetchall()
+        return (np.array([d for d, _ in rows], np.int64),
+                np.array([t for _, t in rows], float))
+
+    def balance(self, epoch, expiry):
+        return self.con.execute("SELECT TOTAL(tokens) FROM vault WHERE run_id=? AND epoch>=?",
+                                (self.run_id, epoch - expiry)).fetchone()[0]
+
+    def expire(self, epoch, expiry):
+        with self.con:
+            cur = self.con.execute("SELECT TOTAL(tokens) FROM vault WHERE run_id=? AND epoch<?",
+                                   (self.run_id, epoch - expiry))
+            expired_sum = cur.fetchone()[0]
+            self.con.execute("DELETE FROM vault WHERE run_id=? AND epoch<?",
+                             (self.run_id, epoch - expiry))
         return expired_sum
+
+    def dump(self):
+        rows = self.con.execute("""SELECT epoch, CAST(donor AS INTEGER), tokens FROM vault
+                                   WHERE run_id=? ORDER BY epoch, rowid""",
+                                (self.run_id,)).fetchall()
+        cols = list(zip(*rows)) or [(), (), ()]
+        return (np.array(cols[0], np.int64), np.array(cols[1], np.int64),
+                np.array(cols[2], float))
+
+    def clear(self) -> None:
+        """Drop every row of this run (other runs in the file are untouched)."""
+        with self.con:
+            self.con.execute("DELETE FROM vault WHERE run_id=?", (self.run_id,))
+
+    def close(self) -> None:
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
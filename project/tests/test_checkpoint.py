@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from project.src.config import Config
+from project.src.env.buyers import BuyerStore
+from project.src.env.market_env import MarketplaceEnv
+from project.src.env.checkpoint import save_checkpoint, load_checkpoint, load_stream
+from project.src.policies.truthful import act_batch
+from project.src.simulate import iter_epochs, simulate
+
+
+def _run(env, epochs):
+    for _ in range(epochs):
+        env.reset()
+        env.step_batch(*act_batch(env.observations(), cfg=env.cfg))
+
+
+def test_resume_matches_uninterrupted_run(tmp_path):
+    rng = np.random.default_rng(3)
+    make = lambda: MarketplaceEnv(BuyerStore(range(200), rng.lognormal(3, 1, 200)),
+                                  [10, 15, 20, 25], cfg=Config())
+    ref = make()
+    _run(ref, 6)
+    env = MarketplaceEnv(BuyerStore(range(200), ref.buyers.income), [10, 15, 20, 25],
+                         cfg=Config())
+    _run(env, 3)
+    save_checkpoint(env, tmp_path / "e3.npz", rng=rng)
+    draw = rng.random()
+    env2, rng2 = load_checkpoint(tmp_path / "e3.npz")
+    assert rng2.random() == draw
+    _run(env2, 3)
+    assert env2.epoch == 6
+    np.testing.assert_array_equal(env2.prices, ref.prices)
+    np.testing.assert_array_equal(env2.buyers.credit, ref.buyers.credit)
+    np.testing.assert_array_equal(env2.ledger.dump()[2], ref.ledger.dump()[2])
+
+
+def test_agent_ids_keep_their_type(tmp_path):
+    for ids in (range(5), [f"b{i}" for i in range(5)]):
+        env = MarketplaceEnv(BuyerStore(ids, np.linspace(5, 40, 5)), [10, 15, 20, 25])
+        save_checkpoint(env, tmp_path / "ids.npz")
+        env2, _ = load_checkpoint(tmp_path / "ids.npz")
+        assert env2.buyers.ids == list(ids) and env2.agents == env.agents
+        first = list(ids)[0]
+        assert env2.buyers[first]["income"] == 5.0 and env2._tier(first) is None
+
+
+def test_simulate_branches_from_checkpoint(tmp_path):
+    full = simulate(epochs=6, n_buyers=100)
+    # burn in 3 epochs, checkpoint, then branch
+    env, _ = load_checkpoint(_burn_in(tmp_path, 3))
+    assert env.epoch == 3
+    tail = simulate(epochs=3, resume=tmp_path / "burn.npz")
+    pd.testing.assert_frame_equal(tail.reset_index(drop=True),
+                                  full.iloc[3:].reset_index(drop=True))
+    what_if = simulate(epochs=3, resume=tmp_path / "burn.npz", lambda_=0.6)
+    assert not np.allclose(what_if["minted"], tail["minted"])
+
+
+def test_interrupted_margin_run_resumes_its_noise_stream(tmp_path):
+    common = dict(policy="margin", n_buyers=100)
+    full = simulate(epochs=6, seed=7, **common)
+    run = iter_epochs(epochs=6, seed=7, checkpoint=tmp_path / "run.npz", **common)
+    head = [next(run) for _ in range(2)]
+    run.close()                                         # interrupted after epoch 1
+    assert load_stream(tmp_path / "run.npz") == (7, 2)
+    tail = simulate(epochs=4, resume=tmp_path / "run.npz", **common)   # seed comes from the file
+    pd.testing.assert_frame_equal(pd.concat([pd.DataFrame(head), tail], ignore_index=True), full)
+
+
+def _burn_in(tmp_path, epochs):
+    rng = np.random.default_rng(42)
+    env = MarketplaceEnv(BuyerStore([f"b{i}" for i in range(100)], rng.lognormal(3, 1, 100)),
+                         [10, 15, 20, 25], cfg=Config())
+    _run(env, epochs)
+    save_checkpoint(env, tmp_path / "burn.npz")
+    return tmp_path / "burn.npz"
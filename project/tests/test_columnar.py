@@ -0,0 +1,28 @@
+import numpy as np, pandas as pd, pyarrow as pa, pyarrow.parquet as pq
+from project.src.columnar import ColumnWriter
+from project.src.simulate import simulate
+
+
+def test_kpis_round_trip_in_chunks(tmp_path):
+    df = simulate(epochs=5, n_buyers=40)
+    with ColumnWriter(tmp_path / "k.parquet", chunk_rows=2) as pw, \
+         ColumnWriter(tmp_path / "k.arrow", chunk_rows=2) as aw:
+        for rec in df.to_dict("records"):
+            pw.write(rec); aw.write(rec)
+    assert pq.ParquetFile(tmp_path / "k.parquet").metadata.num_row_groups == 3
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "k.parquet"), df)
+    table = pa.ipc.open_file(pa.memory_map(str(tmp_path / "k.arrow"))).read_all()
+    pd.testing.assert_frame_equal(table.to_pandas(), df)
+
+
+def test_trace_rows_per_agent_and_epoch(tmp_path):
+    n, E = 30, 4
+    with ColumnWriter(tmp_path / "t.parquet", chunk_rows=50) as tw:
+        kpis = simulate(epochs=E, n_buyers=n, trace=tw)
+    t = pd.read_parquet(tmp_path / "t.parquet")
+    assert len(t) == n * E and (t.groupby("epoch").size() == n).all()
+    assert kpis.equals(simulate(epochs=E, n_buyers=n))          # tracing doesn't perturb the run
+    walked = t["tier"] == -1
+    assert t.loc[walked, "eff_price"].isna().all() and (t.loc[walked, "bid"] == 0).all()
+    first = t[(t.epoch == 0) & ~walked]                         # no credit yet in epoch 0
+    assert np.allclose(first["eff_price"], np.array([10., 15., 20., 25.])[first["tier"]])
@@ -0,0 +1,37 @@
+import numpy as np, pandas as pd, pytest
+from project.src.auction.premium import clear_tiers, clear_tiers_batch
+from project.src.config import Config
+from project.src.env.ensemble import stack_configs
+from project.src.sweep import grid, run_ensemble, run_sweep
+
+
+@pytest.mark.parametrize("policy", ["truthful", "margin"])
+def test_ensemble_matches_independent_runs(policy):
+    points = grid(seed=[1, 2], lambda_=[0.1, 0.3], beta=[200.0, 400.0])
+    common = dict(epochs=10, n_buyers=200, policy=policy)
+    pd.testing.assert_frame_equal(run_ensemble(points, **common),
+                                  run_sweep(points, workers=1, **common),
+                                  check_exact=False, rtol=1e-6, atol=1e-8)
+
+
+def test_only_scenario_fields_may_vary():
+    with pytest.raises(ValueError, match="unit_stock"):
+        stack_configs([Config(), Config(unit_stock=5)])
+    with pytest.raises(ValueError, match="income_mu"):
+        run_ensemble([{"income_mu": 2.0}], epochs=1, n_buyers=10)
+    stacked = stack_configs([Config(lambda_=0.1), Config(lambda_=0.4)])
+    assert stacked.lambda_.shape == (2, 1) and stacked.unit_stock == Config().unit_stock
+
+
+def test_batched_clearing_matches_per_market():
+    rng = np.random.default_rng(0)
+    S, K, n = 5, 4, 400
+    scen, tiers, bids = rng.integers(0, S, n), rng.integers(0, K, n), rng.uniform(0, 10, n)
+    stock, reserves = rng.integers(0, 30, (S, K)), rng.uniform(0, 3, (S, K))
+    win, pay, units = clear_tiers_batch(scen * K + tiers, bids, stock.ravel(), reserves.ravel())
+    paid = dict(zip(win, pay))
+    for s in range(S):
+        rows = np.flatnonzero(scen == s)
+        w, p, u = clear_tiers(tiers[rows], bids[rows], stock[s], reserves[s])
+        assert np.array_equal(u, units.reshape(S, K)[s])
+        assert {int(r): x for r, x in zip(rows[w], p)} == {int(r): paid[r] for r in rows[w]}
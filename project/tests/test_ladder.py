@@ -0,0 +1,65 @@
+import pathlib, subprocess, sys
+import numpy as np, pytest
+from project.src.ladder import GiniSketch, gini, gini_batch, isotonic, isotonic_batch, weighted_gini
+
+
+def _gini_pairwise(eff):
+    n = len(eff)
+    return np.abs(eff[:, None] - eff[None, :]).sum() / (2 * n**2 * eff.mean())
+
+
+def test_gini_matches_pairwise():
+    rng = np.random.default_rng(0)
+    for x in (rng.lognormal(3, 1, 1000), rng.uniform(-2, 10, 257), np.ones(5)):
+        assert abs(gini(x) - _gini_pairwise(x)) < 1e-12
+    assert gini(np.array([])) == 0.0
+
+
+def test_weighted_gini_equals_repeated_sample():
+    rng = np.random.default_rng(1)
+    x = rng.lognormal(0, 1, 50)
+    w = rng.integers(1, 6, 50)
+    assert abs(weighted_gini(x, w) - gini(np.repeat(x, w))) < 1e-12
+    assert abs(weighted_gini(x, np.ones(50)) - gini(x)) < 1e-12
+
+
+def test_isotonic_matches_sklearn():
+    IsotonicRegression = pytest.importorskip("sklearn.isotonic").IsotonicRegression
+    rng = np.random.default_rng(2)
+    for _ in range(500):
+        y = rng.normal(20, 10, rng.integers(1, 9))
+        ref = IsotonicRegression(increasing=True).fit_transform(range(len(y)), y)
+        assert np.allclose(isotonic(y), ref, rtol=1e-14, atol=0)
+    assert np.array_equal(isotonic([3., 1., 2.]), [2., 2., 2.])
+
+
+def test_simulate_import_skips_heavy_deps():
+    code = ("import sys, src.simulate; "
+            "print(sorted({'ot', 'sklearn', 'scipy', 'pandas'} & set(sys.modules)))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         check=True, cwd=pathlib.Path(__file__).parents[1]).stdout
+    assert out.strip() == "[]"
+
+
+def test_batched_rows_match_loops():
+    rng = np.random.default_rng(3)
+    Y = rng.normal(20, 10, (300, 5))
+    np.testing.assert_allclose(isotonic_batch(Y), [isotonic(y) for y in Y], rtol=1e-12)
+    X = rng.lognormal(3, 1, (4, 200))
+    X[X > 40] = np.nan
+    X[3] = np.nan                                               # empty row
+    np.testing.assert_allclose(gini_batch(X), [gini(x[~np.isnan(x)]) for x in X], atol=1e-14)
+
+
+def test_gini_sketch_is_mergeable_and_bounded():
+    rng = np.random.default_rng(4)
+    x = rng.uniform(-5, 50, 200_000)
+    a, b = GiniSketch(-5, 50, 256), GiniSketch(-5, 50, 256)
+    for chunk in np.array_split(x[:120_000], 5):
+        a.add(chunk)
+    b.add(x[120_000:])
+    a.merge(b)
+    assert abs(a.value() - gini(x)) <= a.error() < 1e-4
+    few = rng.choice([3.0, 7.5, 10.0, 12.25], 10_000)            # one value per bin: exact
+    s = GiniSketch(0, 20, 64); s.add(few)
+    assert s.error() == 0 and abs(s.value() - gini(few)) < 1e-12
@@ -0,0 +1,48 @@
+import numpy as np
+from project.src.tokens.ledger import Ledger, MemoryLedger
+
+
+def test_load_aggregates_per_donor():
+    led = MemoryLedger(expiry=3)
+    led.mint_many(0, [4, 7], [1.0, 2.0])
+    led.mint_many(1, [4], [3.0])
+    donors, tokens = led.load(1, 3)
+    np.testing.assert_array_equal(donors, [4, 7])
+    np.testing.assert_allclose(tokens, [4.0, 2.0])
+
+
+def test_expiry_matches_window():
+    led = MemoryLedger(expiry=3)
+    expired = []
+    for e in range(8):
+        led.mint(e, e, 1.0)
+        expired.append(led.expire(e, 3))
+        assert led.balance(e, 3) == min(e + 1, 4)
+    # tokens minted at e-4 are reported as expired at e
+    assert expired == [0, 0, 0, 0, 1, 1, 1, 1]
+
+
+def test_sqlite_runs_share_file_without_clobbering(tmp_path):
+    from project.src.tokens.ledger import SqliteLedger
+    db = tmp_path / "vault.db"
+    with SqliteLedger(db, "a") as a, SqliteLedger(db, "b") as b:
+        a.mint_many(0, [1, 2, 1], [1.0, 2.0, 3.0])
+        b.mint_many(0, [1], [10.0])
+        donors, tokens = a.load(0, 3)
+        np.testing.assert_array_equal(donors, [1, 2])
+        np.testing.assert_allclose(tokens, [4.0, 2.0])
+        assert a.expire(4, 3) == 6.0
+        assert b.balance(0, 3) == 10.0          # untouched by a.expire
+    with SqliteLedger(db, "b") as b:             # durable across reopen
+        assert b.balance(0, 3) == 10.0
+
+
+def test_load_before_any_mint_is_empty():
+    donors, tokens = MemoryLedger(expiry=3).load(1, 3)
+    assert donors.size == 0 and tokens.size == 0
+
+
+def test_ledger_interface_is_abstract():
+    import pytest
+    with pytest.raises(TypeError):
+        Ledger()
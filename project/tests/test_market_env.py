@@ -0,0 +1,101 @@
+import numpy as np
+from project.src.env.market_env import MarketplaceEnv
+
+
+def _env():
+    buyers = {"A": {"income": 30.}, "B": {"income": 12., "credit": 2.}}
+    return MarketplaceEnv(buyers, [10, 15, 20, 25])
+
+
+def test_obs_are_views_of_matrix():
+    env = _env()
+    obs, _ = env.reset()
+    M = env.observations()
+    assert M.shape == (2, 6)
+    assert np.shares_memory(obs["A"], M)
+    np.testing.assert_array_equal(obs["B"], [10, 15, 20, 25, 12., 2.])
+
+
+def test_buyer_dict_layer_writes_through():
+    env = _env()
+    env.buyers["A"]["credit"] += 1.5
+    assert env.buyers.credit[0] == 1.5
+    assert env.observations()[0, -1] == 1.5
+
+
+def _tier_loop(prices, inc, cred):
+    for k in range(len(prices)-1, -1, -1):
+        if inc >= prices[k] - cred:
+            return k
+    return -1
+
+
+def test_tier_assignment_matches_scan_and_caches():
+    rng = np.random.default_rng(0)
+    buyers = {f"b{i}": {"income": x} for i, x in enumerate(rng.uniform(0, 30, 300))}
+    for ladder in ([10, 15, 20, 25], [15, 10, 25, 20]):
+        env = MarketplaceEnv(buyers, ladder)
+        env.buyers.add_credit(np.arange(0, 300, 3), 4.0)
+        tiers, eff = env.tier_assignment()
+        B = env.buyers
+        ref = [_tier_loop(env.prices, B.income[i], B.credit[i]) for i in range(300)]
+        assert list(tiers) == ref
+        np.testing.assert_allclose(eff[tiers >= 0],
+                                   env.prices[tiers[tiers >= 0]] - B.credit[tiers >= 0])
+    assert env.tier_assignment() is env.tier_assignment()
+    cached = env.tier_assignment()
+    env.buyers["b1"]["credit"] = 100.
+    assert env.tier_assignment() is not cached and env._tier("b1") == 3
+
+
+def test_closure_profile_is_switchable():
+    from project.src.policies.truthful import act_batch
+    buyers = {f"b{i}": {"income": x} for i, x in enumerate(np.linspace(5, 40, 50))}
+    assert MarketplaceEnv(buyers, [10, 15, 20, 25]).profile is None
+    env = MarketplaceEnv(buyers, [10, 15, 20, 25], profile=True)
+    env.reset()
+    tiers, bids = act_batch(env.observations())
+    env.step_batch(tiers, bids)
+    rec = env.profile.record()
+    assert rec["n_bids"] == (tiers < 4).sum() and rec["n_recipients"] == 50
+    assert all(rec[f"t_{p}"] >= 0 for p in ("auction", "mint", "load", "rebate",
+                                              "expire", "gini", "ladder"))
+
+
+def test_closure_publishes_frozen_metrics():
+    import dataclasses, pytest
+    from project.src.policies.truthful import act_batch
+    buyers = {f"b{i}": {"income": x} for i, x in enumerate(np.linspace(5, 40, 200))}
+    env = MarketplaceEnv(buyers, [10, 15, 20, 25])
+    assert env.metrics is None
+    for _ in range(3):
+        env.reset()
+        credit, prices = env.buyers.credit.sum(), env.prices.copy()
+        env.step_batch(*act_batch(env.observations()))
+        m = env.metrics
+        assert m.epoch == env.epoch - 1 and m.prices == tuple(env.prices)
+        np.testing.assert_allclose(m.sell_through, sum(m.sales) / (30 * 4))
+        np.testing.assert_allclose(m.revenue, np.dot(m.sales, prices))
+        np.testing.assert_allclose(m.credits_issued, env.buyers.credit.sum() - credit)
+        assert m.token_balance == env.ledger.balance(env.epoch, env.cfg.token_expiry)
+    assert m.credits_issued > 0 and m.record()["sold3"] == m.sales[3]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        m.gini = 0.0
+
+
+def test_submit_rejects_duplicate_and_out_of_range_agents():
+    import pytest
+    env = _env()
+    with pytest.raises(ValueError, match="duplicate"):
+        env.submit([0, 0], [1, 2], [12., 18.])
+    with pytest.raises(ValueError, match="range"):
+        env.submit([0, 2], [1, 2], [12., 18.])
+    with pytest.raises(ValueError, match="range"):
+        env.submit([-1], [1], [12.])
+    assert env.submit([0], [1], [12.]) == 1
+    with pytest.raises(ValueError, match="duplicate"):     # already bid in an earlier chunk
+        env.submit([1, 0], [0, 1], [10., 12.])
+    assert env.submit([1], [0], [10.]) == 1
+    env.close_epoch()
+    env.reset()
+    assert env.submit([0, 1], [1, 0], [12., 10.]) == 2
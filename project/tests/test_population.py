@@ -0,0 +1,22 @@
+import numpy as np, pandas as pd, pytest
+from project.src.env.population import open_population
+from project.src.simulate import simulate
+
+
+@pytest.mark.parametrize("policy", ["truthful", "margin"])
+def test_chunked_population_matches_in_memory(policy, tmp_path):
+    common = dict(epochs=8, n_buyers=3000, policy=policy)
+    ref = simulate(**common)
+    out = simulate(**common, chunk_size=700, population_dir=tmp_path)
+    assert (out["gini_error"] == 0).all()            # few distinct effective prices: exact
+    pd.testing.assert_frame_equal(out.drop(columns="gini_error"), ref,
+                                  check_exact=False, rtol=1e-9, atol=1e-9)
+    income, credit = open_population(tmp_path, "r")  # state lives in the memory maps
+    assert isinstance(credit, np.memmap) and len(income) == 3000 and credit.max() > 0
+
+
+def test_chunked_population_rejects_unsupported_modes():
+    with pytest.raises(ValueError):
+        simulate(epochs=1, n_buyers=10, chunk_size=5, profile=True)
+    with pytest.raises(ValueError, match="exact1d"):
+        simulate(epochs=1, n_buyers=10, chunk_size=5, rebate_solver="sinkhorn")
@@ -12,4 +12,44 @@ def test_rebate_mass_conservation():
     recip_inc = np.array([1e3, 2e3, 3e3, 8e3])
     donor_tok = np.array([10., 20., 30.])
     out = rebate(donor_inc, donor_tok, recip_inc)
-    assert abs(out.sum() - donor_tok.sum()) < 0.01 
\ No newline at end of file
+    assert abs(out.sum() - donor_tok.sum()) < 0.01 
+
+def test_rebate_solvers_agree():
+    rng = np.random.default_rng(0)
+    donor_inc = rng.lognormal(12, 0.5, 40)
+    donor_tok = rng.uniform(0, 5, 40)
+    recip_inc = rng.uniform(1e3, 9e3, 25)
+    exact = rebate(donor_inc, donor_tok, recip_inc, solver="exact1d")
+    entropic = rebate(donor_inc, donor_tok, recip_inc, solver="sinkhorn")
+    assert abs(exact.sum() - donor_tok.sum()) < 1e-9
+    np.testing.assert_allclose(exact, entropic, atol=0.01)
+
+
+def test_exact_plan_is_optimal():
+    import ot
+    from project.src.fairness.ot_rebate import transport_plan_1d
+    rng = np.random.default_rng(1)
+    x, y = rng.uniform(0, 1, 9), rng.uniform(0, 1, 6)
+    a = rng.random(9); a /= a.sum()
+    b = np.full(6, 1 / 6)
+    i, j, w = transport_plan_1d(x, a, y, b)
+    M = np.abs(x[:, None] - y[None, :])
+    assert abs((w * M[i, j]).sum() - (ot.emd(a, b, M) * M).sum()) < 1e-12
+    np.testing.assert_allclose(np.bincount(i, w, minlength=9), a)
+
+
+def test_sinkhorn_warm_start_cuts_iterations():
+    from project.src.fairness.ot_rebate import SinkhornRebate
+    rng = np.random.default_rng(0)
+    recip_inc = rng.uniform(1e3, 9e3, 300)
+    donor_inc = rng.uniform(1e3, 1e4, 200)
+    donor_tok = rng.lognormal(0, 2, 200)
+    ids = np.arange(1000, 1200), np.arange(300)
+    solver = SinkhornRebate()
+    for e in range(2):
+        out = solver(donor_inc * (1 + 1e-3 * e), donor_tok, recip_inc, *ids)
+        assert abs(out.sum() - donor_tok.sum()) < 0.01
+    cold, warm = solver.history
+    assert not cold.warm and warm.warm
+    assert warm.n_iter < cold.n_iter
+    assert warm.marginal_err < 1e-6
@@ -0,0 +1,32 @@
+import os
+from project.src import result_cache
+from project.src.result_cache import ResultCache, cached_simulate, run_key, run_params
+
+
+def test_cache_hit_skips_simulation(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+    first = cached_simulate(epochs=3, n_buyers=50, cache=cache)
+    monkeypatch.setattr(result_cache, "simulate", lambda *a, **k: 1 / 0)
+    again = cached_simulate(epochs=3, n_buyers=50, cache=cache)
+    assert again.equals(first)
+
+
+def test_key_covers_overrides_and_defaults():
+    base = run_key(run_params(epochs=3))
+    assert run_key(run_params(3)) == base                       # positional == keyword
+    assert run_key(run_params(epochs=3, lambda_=0.2)) == base   # Config default
+    assert run_key(run_params(epochs=3, lambda_=0.3)) != base
+    assert run_key(run_params(epochs=3, prices=(10, 15, 20, 26))) != base
+    assert run_params(epochs=3, profile=True) is None           # timings aren't reproducible
+
+
+def test_lru_eviction_by_size(tmp_path):
+    df = cached_simulate(epochs=2, n_buyers=20, cache=ResultCache(tmp_path))
+    size = os.path.getsize(next(tmp_path.glob("*.parquet")))
+    cache = ResultCache(tmp_path, max_bytes=int(2.5 * size))
+    cache.put("b", df)
+    a = next(p.stem for p in tmp_path.glob("*.parquet") if p.stem != "b")
+    os.utime(tmp_path / "b.parquet", (0, 0))                    # b is now oldest
+    assert cache.get(a) is not None                             # refresh a
+    cache.put("c", df)
+    assert {p.stem for p in tmp_path.glob("*.parquet")} == {a, "c"}
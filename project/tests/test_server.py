@@ -0,0 +1,79 @@
+import asyncio, json
+import numpy as np
+from project.src.env.buyers import BuyerStore
+from project.src.env.market_env import MarketplaceEnv
+from project.src.policies.truthful import act_batch
+from project.src.server import BidServer
+
+
+def _env(n=200):
+    income = np.random.default_rng(0).lognormal(3.0, 1.0, n)
+    return MarketplaceEnv(BuyerStore([f"b{i}" for i in range(n)], income), [10, 15, 20, 25])
+
+
+async def _send(writer, **msg):
+    writer.write(json.dumps(msg).encode() + b"\n")
+    await writer.drain()
+
+
+def test_served_epochs_match_step_batch():
+    async def session():
+        server = await BidServer(_env(), epoch_seconds=0.5, batch_size=64, epochs=3).start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await _send(writer, op="subscribe", agents=[f"b{i}" for i in range(200)])
+        closed, acked = [], 0
+        while len(closed) < 3:
+            msg = json.loads(await reader.readline())
+            if msg["op"] == "obs":
+                obs = np.column_stack([np.tile(msg["prices"], (200, 1)), msg["income"], msg["credit"]])
+                tiers, bids = act_batch(obs)
+                rows = [r for r in zip(msg["agents"], tiers.tolist(), bids.tolist()) if r[1] < 4]
+                for i in range(0, len(rows), 50):             # several messages per epoch
+                    await _send(writer, op="bid", id=i, epoch=msg["epoch"], bids=rows[i:i + 50])
+            elif msg["op"] == "ack":
+                assert msg["rejected"] == []
+                acked += msg["accepted"]
+            elif msg["op"] == "closed":
+                closed.append(msg)
+        metrics = server.metrics()
+        await server.run()
+        writer.close()
+        return closed, acked, metrics
+
+    closed, acked, metrics = asyncio.run(session())
+    ref, n_bids = _env(), 0
+    for msg in closed:
+        ref.reset()
+        tiers, bids = act_batch(ref.observations())
+        n_bids += ref.submit(np.arange(200), tiers, bids)
+        ref.close_epoch()
+        assert msg["revenue"] == ref.revenue
+        np.testing.assert_array_equal(msg["prices"], ref.prices)
+    assert metrics["bids_accepted"] == acked == n_bids and metrics["batches"] >= 3
+
+
+def test_rejects_duplicate_unknown_and_stale_bids():
+    async def session():
+        server = await BidServer(_env(), epoch_seconds=60).start()
+        server.env.stock[3] = 0
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await _send(writer, op="bid", id=1, bids=[["b0", 1, 2.0], ["b0", 2, 3.0], ["zz", 0, 1.0],
+                                                  ["b1", 9, 1.0], ["b4", 4, 1.0], ["b5", True, 1.0],
+                                                  ["b6", 0, 1.0], ["b7", 3, 1.0]])
+        await _send(writer, op="bid", id=2, epoch=-1, bids=[["b2", 0, 1.0]])
+        await _send(writer, op="bid", id=3, bids=[["b3", 0]])
+        await _send(writer, op="bid", id=4, epoch=5, bids=[["b2", 0, 1.0]])
+        replies = [json.loads(await reader.readline()) for _ in range(4)]
+        metrics = server.metrics()
+        queued = sum(len(chunk[0]) for chunk in server.env._bids)
+        writer.close()
+        await server.close()
+        return sorted(replies, key=lambda m: m.get("id") or 0), metrics, queued
+
+    (error, first, stale, future), metrics, queued = asyncio.run(session())
+    assert first["accepted"] == 2 == metrics["bids_accepted"] == queued
+    assert [r[1] for r in first["rejected"]] == ["already bid this epoch", "unknown agent"] + \
+                                                ["invalid tier or bid"] * 3 + ["tier sold out"]
+    assert stale["rejected"] == [["b2", "stale epoch"]]
+    assert future["rejected"] == [["b2", "future epoch"]]
+    assert error["op"] == "error"
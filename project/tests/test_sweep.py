@@ -0,0 +1,16 @@
+import pandas as pd
+from project.src.config import cfg
+from project.src.sweep import grid, run_sweep
+
+
+def test_sweep_is_isolated_and_reproducible():
+    lam0 = cfg.lambda_
+    points = grid(lambda_=[0.1, 0.5], policy=["truthful", "margin"], seed=[1])
+    common = dict(epochs=3, n_buyers=60)
+    serial = run_sweep(points, workers=1, **common)
+    pooled = run_sweep(points, workers=2, **common)
+    pd.testing.assert_frame_equal(serial, pooled)
+    assert len(serial) == 4 * 3 and serial["point"].nunique() == 4
+    assert cfg.lambda_ == lam0                      # global config untouched
+    by_lam = serial.groupby("lambda_")["minted"].sum()
+    assert by_lam[0.1] != by_lam[0.5]
@@ -10,4 +10,60 @@ def test_truthful_vs_shaded():
     bids_shaded = [("A", 4.), ("B", 3.)]
     _, pay_shade = resolve_tier(bids_shaded.copy(), reserves)
 
-    assert pay_true <= pay_shade   # truthful weakly better
\ No newline at end of file
+    assert pay_true <= pay_shade   # truthful weakly better
+
+def _clear(bids, stock=2, reserve=1.0):
+    from project.src.auction.premium import clear_tiers
+    bids = np.asarray(bids, float)
+    return clear_tiers(np.zeros(len(bids), int), bids,
+                       np.array([stock]), np.array([reserve]))
+
+
+def test_multi_unit_uniform_price():
+    win, pay, units = _clear([5., 3., 9., 4.], stock=2)
+    assert sorted(win) == [0, 2] and units[0] == 2
+    assert np.all(pay == 4.)               # (s+1)-th highest bid
+    _, pay, _ = _clear([5., 3.], stock=2, reserve=1.5)
+    assert np.all(pay == 1.5)              # unsold unit → reserve price
+
+
+def test_multi_unit_truthful_vs_shaded():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        others = rng.uniform(0, 10, 6)
+        value, shaded = rng.uniform(0, 10), rng.uniform(0, 10)
+        util = []
+        for b in (value, shaded):
+            win, pay, _ = _clear(np.r_[b, others], stock=3)
+            util.append(value - pay[list(win).index(0)] if 0 in win else 0.)
+        assert util[0] >= util[1] - 1e-12   # truthful weakly better
+
+
+def test_bids_below_reserve_are_not_eligible():
+    # value 0.5 < reserve 1: truthful bid must lose, not win and pay 1
+    others = [0.1, 0.2, 0.3, 0.4, 5., 6.]
+    win, pay, units = _clear([0.5] + others, stock=3, reserve=1.0)
+    assert 0 not in win and units[0] == 2 and np.all(pay == 1.0)
+    for b in (0.5, 0.05, 2.0):                    # no bid beats truthful utility 0
+        win, pay, _ = _clear([b] + others, stock=3, reserve=1.0)
+        util = 0.5 - pay[list(win).index(0)] if 0 in win else 0.
+        assert util <= 0.
+    win, pay, units = _clear([4., 0.2, 3., 2.], stock=2, reserve=1.0)
+    assert sorted(win) == [0, 2] and np.all(pay == 2.)   # price set among eligible bids
+
+
+def test_single_unit_matches_resolve_tier():
+    bids = [("A", 5.), ("B", 3.), ("C", 4.)]
+    winner, pay = resolve_tier(bids.copy(), {a: 1.0 for a, _ in bids})
+    win, pays, _ = _clear([b for _, b in bids], stock=1)
+    assert bids[win[0]][0] == winner and pays[0] == pay
+
+
+def test_clear_all_tiers_in_one_call():
+    from project.src.auction.premium import clear_tiers
+    tiers = np.array([0, 0, 1, 1, 1, 3])
+    bids  = np.array([2., 1., 7., 6., 5., 9.])
+    win, pay, units = clear_tiers(tiers, bids, np.array([5, 2, 5, 5]),
+                                  np.array([.5, .5, .5, .5]))
+    assert list(units) == [2, 2, 0, 1]
+    assert dict(zip(win, pay)) == {0: .5, 1: .5, 2: 5., 3: 5., 5: .5}